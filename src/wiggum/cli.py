@@ -1,6 +1,7 @@
 """CLI interface for wiggum."""
 
 import time
+from dataclasses import replace
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Optional
@@ -14,7 +15,9 @@ from wiggum.agents import (
 )
 from wiggum.config import (
     CONFIG_FILE,
+    ResolvedRunConfig,
     read_config,
+    render_template,
     resolve_run_config,
     resolve_templates_dir,
     validate_config,
@@ -34,10 +37,9 @@ from wiggum.changelog import (
 from wiggum.tasks import (
     add_task_to_file,
     get_all_tasks,
-    get_current_task,
     get_existing_task_descriptions,
     get_existing_tasks_context,
-    tasks_remaining,
+    get_task_status,
 )
 
 app = typer.Typer(help="Run iterative agent loops with task tracking")
@@ -66,6 +68,21 @@ def _resolve_tasks_file(tasks_file: Path) -> Path:
     return tasks_file
 
 
+def _read_text_if_exists(path: Path) -> Optional[str]:
+    """Read a file that may be absent, with a single open instead of stat+open.
+
+    Args:
+        path: File to read.
+
+    Returns:
+        The file contents, or None if the file does not exist.
+    """
+    try:
+        return path.read_text()
+    except FileNotFoundError:
+        return None
+
+
 def tasks_file_option(
     short_flag: bool = True,
     help_text: str = "Tasks file (default: TODO.md)",
@@ -123,6 +140,33 @@ def _run_learning_consolidation(
         typer.echo(f"Warning: Failed to consolidate learnings: {reason}", err=True)
 
 
+def _build_meta_prompt(
+    meta_prompt_path: Path,
+    tasks_file: Path,
+    readme_content: str,
+    fallback_goal: str,
+) -> str:
+    """Render the planning meta-prompt shared by init, suggest and --identify-tasks.
+
+    Args:
+        meta_prompt_path: Path to the META-PROMPT.md template.
+        tasks_file: Tasks file whose existing tasks are listed in the prompt.
+        readme_content: README text to infer the goal from (may be empty).
+        fallback_goal: Goal text to use when there is no README content.
+
+    Returns:
+        The rendered meta-prompt.
+    """
+    if readme_content:
+        goal = f"(Infer from README below)\n\n## README.md\n\n{readme_content}"
+    else:
+        goal = fallback_goal
+    return render_template(
+        meta_prompt_path.read_text(),
+        {"goal": goal, "existing_tasks": get_existing_tasks_context(tasks_file)},
+    )
+
+
 def _ensure_learning_diary_dir() -> None:
     """Ensure the learning diary directory exists (lazy import)."""
     from wiggum.learning import ensure_diary_dir
@@ -163,6 +207,76 @@ def _build_dry_run_command(
     return cmd
 
 
+def _format_dry_run(cfg: ResolvedRunConfig, agent_name: str, prompt: str) -> str:
+    """Describe what `wiggum run` would do, for --dry-run output.
+
+    Args:
+        cfg: Resolved run configuration.
+        agent_name: Name of the agent that would run.
+        prompt: Loop prompt that would be sent to the agent.
+
+    Returns:
+        The dry-run report, one setting per line.
+    """
+    cmd = _build_dry_run_command(agent_name, cfg.yolo, cfg.allow_paths)
+    lines = [
+        f"Would run {cfg.max_iterations} iterations",
+        f"Agent: {agent_name}",
+    ]
+    if cfg.model:
+        lines.append(f"Model: {cfg.model}")
+    lines.append(f"Timeout: {cfg.timeout}s per iteration")
+    lines.append(f"Command: {' '.join(cmd)}")
+    lines.append(f"Stop condition: tasks (check {cfg.tasks_file})")
+    if cfg.keep_running:
+        lines.append("Task completion mode: keep running (continue for all iterations)")
+    else:
+        lines.append("Task completion mode: stop when done (exit when tasks complete)")
+    if cfg.continue_session:
+        lines.append(
+            "Session mode: continue (will pass -c to claude after first iteration)"
+        )
+    else:
+        lines.append("Session mode: reset (fresh session each iteration)")
+    if cfg.log_file:
+        lines.append(f"Log file: {cfg.log_file}")
+    if cfg.show_progress:
+        lines.append(
+            "Progress tracking: enabled (will show file changes via git status)"
+        )
+    if cfg.no_branch:
+        lines.append("Git safety: disabled (--no-branch)")
+    elif cfg.force:
+        lines.append("Git safety: disabled (--force)")
+    else:
+        lines.append("Git safety: enabled (will create branch in git repos)")
+    if cfg.create_pr:
+        lines.append("PR creation: enabled (will create PR after loop)")
+    lines.append(f"Branch prefix: {cfg.branch_prefix}")
+    lines.append(f"Prompt:\n---\n{prompt}\n---")
+    return "\n".join(lines)
+
+
+def _format_iteration_header(
+    iteration: int, max_iterations: int, current_task: Optional[str]
+) -> str:
+    """Build the banner printed before each loop iteration.
+
+    Args:
+        iteration: 1-based number of the iteration about to run.
+        max_iterations: Iteration limit for the loop.
+        current_task: First incomplete task, if any.
+
+    Returns:
+        The banner, framed by separator lines with a blank line on each side.
+    """
+    lines = ["", "=" * 60, f"Iteration {iteration}/{max_iterations}"]
+    if current_task:
+        lines.append(f"Current task: {current_task}")
+    lines.extend(["=" * 60, ""])
+    return "\n".join(lines)
+
+
 @app.command()
 def run(
     prompt_file: Optional[Path] = typer.Option(
@@ -357,44 +471,7 @@ def run(
             raise typer.Exit(1)
 
     if dry_run:
-        cmd = _build_dry_run_command(agent_name, cfg.yolo, cfg.allow_paths)
-        typer.echo(f"Would run {cfg.max_iterations} iterations")
-        typer.echo(f"Agent: {agent_name}")
-        if cfg.model:
-            typer.echo(f"Model: {cfg.model}")
-        typer.echo(f"Timeout: {cfg.timeout}s per iteration")
-        typer.echo(f"Command: {' '.join(cmd)}")
-        typer.echo(f"Stop condition: tasks (check {cfg.tasks_file})")
-        if cfg.keep_running:
-            typer.echo(
-                "Task completion mode: keep running (continue for all iterations)"
-            )
-        else:
-            typer.echo(
-                "Task completion mode: stop when done (exit when tasks complete)"
-            )
-        if cfg.continue_session:
-            typer.echo(
-                "Session mode: continue (will pass -c to claude after first iteration)"
-            )
-        else:
-            typer.echo("Session mode: reset (fresh session each iteration)")
-        if cfg.log_file:
-            typer.echo(f"Log file: {cfg.log_file}")
-        if cfg.show_progress:
-            typer.echo(
-                "Progress tracking: enabled (will show file changes via git status)"
-            )
-        if cfg.no_branch:
-            typer.echo("Git safety: disabled (--no-branch)")
-        elif cfg.force:
-            typer.echo("Git safety: disabled (--force)")
-        else:
-            typer.echo("Git safety: enabled (will create branch in git repos)")
-        if cfg.create_pr:
-            typer.echo("PR creation: enabled (will create PR after loop)")
-        typer.echo(f"Branch prefix: {cfg.branch_prefix}")
-        typer.echo(f"Prompt:\n---\n{prompt}\n---")
+        typer.echo(_format_dry_run(cfg, agent_name, prompt))
         return
 
     # Validate agent CLI is available before running
@@ -484,37 +561,42 @@ def run(
     if cfg.learning_enabled:
         _ensure_learning_diary_dir()
 
-    def check_stop_conditions() -> Optional[str]:
+    def check_stop_conditions(remaining: bool) -> Optional[str]:
         """Check stop conditions and return exit message if should stop."""
-        if not cfg.keep_running and not tasks_remaining(cfg.tasks_file):
+        if not cfg.keep_running and not remaining:
             return f"All tasks in {cfg.tasks_file} are complete. Exiting."
         return None
 
+    # The agent is stateless between runs, so one instance serves every
+    # iteration; session continuity is handled by continue_session below.
+    agent_instance = get_agent(cfg.agent)
+    # Agent settings are fixed for the whole loop; only session continuation
+    # differs between the first and later iterations.
+    first_config = AgentConfig(
+        prompt=prompt,
+        yolo=cfg.yolo,
+        allow_paths=cfg.allow_paths,
+        timeout_seconds=cfg.timeout,
+        model=cfg.model,
+    )
+    continue_config = replace(first_config, continue_session=cfg.continue_session)
+
+    # Task status is read once up front and then refreshed after each run;
+    # nothing touches the tasks file between the post-run check and the next
+    # iteration, so that result doubles as the next pre-check.
+    remaining, current_task = get_task_status(cfg.tasks_file)
+
     for i in range(1, cfg.max_iterations + 1):
         # Check stop conditions before running
-        exit_message = check_stop_conditions()
+        exit_message = check_stop_conditions(remaining)
         if exit_message:
             typer.echo(f"\n{exit_message}")
             break
 
-        typer.echo(f"\n{'=' * 60}")
-        typer.echo(f"Iteration {i}/{cfg.max_iterations}")
-        current_task = get_current_task(cfg.tasks_file)
-        if current_task:
-            typer.echo(f"Current task: {current_task}")
-        typer.echo(f"{'=' * 60}\n")
-
-        # Run the agent
-        agent_instance = get_agent(cfg.agent)
-        agent_config = AgentConfig(
-            prompt=prompt,
-            yolo=cfg.yolo,
-            allow_paths=cfg.allow_paths,
-            # After first iteration, continue session if requested
-            continue_session=cfg.continue_session and i > 1,
-            timeout_seconds=cfg.timeout,
-            model=cfg.model,
-        )
+        typer.echo(_format_iteration_header(i, cfg.max_iterations, current_task))
+
+        # Run the agent (after first iteration, continue session if requested)
+        agent_config = continue_config if i > 1 else first_config
 
         # Debug output before agent starts
         if cfg.show_progress:
@@ -563,7 +645,8 @@ def run(
             typer.echo(f"Files: {changes}")
 
         # Check stop conditions after running
-        exit_message = check_stop_conditions()
+        remaining, current_task = get_task_status(cfg.tasks_file)
+        exit_message = check_stop_conditions(remaining)
         if exit_message:
             typer.echo(f"\n{exit_message}")
             break
@@ -583,12 +666,14 @@ def run(
             create_pr as git_create_pr,
             get_current_branch,
             get_main_branch_name,
+            get_repo_info,
             has_remote,
             is_working_directory_clean,
             push_branch,
         )
 
-        current = get_current_branch()
+        repo_info = get_repo_info()
+        current = repo_info.current_branch or get_current_branch()
         typer.echo(f"\nChanges are on branch: {current}")
 
         if cfg.create_pr:
@@ -678,10 +763,8 @@ def init(
     typer.echo("Setting up wiggum...\n")
 
     # Read README for context if available
-    readme_path = Path("README.md")
-    readme_content = ""
-    if readme_path.exists():
-        readme_content = readme_path.read_text()
+    readme_content = _read_text_if_exists(Path("README.md"))
+    if readme_content is not None:
         typer.echo("Found README.md - using it for context.")
 
     use_suggestions = False
@@ -692,20 +775,12 @@ def init(
     if suggest:
         # Agent-assisted planning
         typer.echo("\nAnalyzing codebase and planning tasks...")
-        meta_prompt = meta_prompt_path.read_text()
-        if readme_content:
-            meta_prompt = meta_prompt.replace(
-                "{{goal}}",
-                f"(Infer from README below)\n\n## README.md\n\n{readme_content}",
-            )
-        else:
-            meta_prompt = meta_prompt.replace(
-                "{{goal}}", "(No README found - analyze codebase)"
-            )
-
-        # Include existing tasks context if TODO.md exists
-        existing_tasks_context = get_existing_tasks_context(tasks_path)
-        meta_prompt = meta_prompt.replace("{{existing_tasks}}", existing_tasks_context)
+        meta_prompt = _build_meta_prompt(
+            meta_prompt_path,
+            tasks_path,
+            readme_content or "",
+            fallback_goal="(No README found - analyze codebase)",
+        )
 
         config, error = run_claude_with_retry(meta_prompt)
 
@@ -810,7 +885,7 @@ def init(
 
     # Generate files from templates
     prompt_template = prompt_template_path.read_text()
-    prompt_content = prompt_template.replace("{{doc_files}}", doc_files)
+    prompt_content = render_template(prompt_template, {"doc_files": doc_files})
 
     # Handle TODO.md: merge if exists (unless --force), otherwise create new
     if tasks_file_exists and not force:
@@ -829,15 +904,13 @@ def init(
         typer.echo(f"\nUpdated {tasks_path}: added {new_tasks_added} new task(s)")
     else:
         # Create new or overwrite with --force
-        tasks_template = (
-            tasks_template_path.read_text()
-            if tasks_template_path.exists()
-            else "# Tasks\n\n## Done\n\n## In Progress\n\n## Todo\n\n{{tasks}}\n"
-        )
-        tasks_content = tasks_template.replace(
-            "{{tasks}}",
-            "\n".join(tasks) if tasks else "- [ ] (add your first task here)",
-        )
+        tasks_template = _read_text_if_exists(tasks_template_path)
+        if tasks_template is None:
+            tasks_template = (
+                "# Tasks\n\n## Done\n\n## In Progress\n\n## Todo\n\n{{tasks}}\n"
+            )
+        task_lines = "\n".join(tasks) if tasks else "- [ ] (add your first task here)"
+        tasks_content = render_template(tasks_template, {"tasks": task_lines})
         tasks_path.write_text(tasks_content)
         typer.echo(f"\nCreated {tasks_path}")
 
@@ -847,7 +920,7 @@ def init(
     # Add wiggum files to .gitignore
     gitignore_path = Path(".gitignore")
     wiggum_entries = [".wiggum/", "LOOP-PROMPT.md", ".wiggum.toml"]
-    gitignore_content = gitignore_path.read_text() if gitignore_path.exists() else ""
+    gitignore_content = _read_text_if_exists(gitignore_path) or ""
     missing = [e for e in wiggum_entries if e not in gitignore_content]
     if missing:
         section = "\n# wiggum\n" + "\n".join(missing) + "\n"
@@ -875,23 +948,12 @@ def _run_identify_tasks(tasks_file: Path) -> None:
     typer.echo("Analyzing codebase to identify tasks...")
 
     # Build the meta-prompt with goal from README if available
-    meta_prompt = meta_prompt_path.read_text()
-
-    readme_path = Path("README.md")
-    if readme_path.exists():
-        readme_content = readme_path.read_text()
-        meta_prompt = meta_prompt.replace(
-            "{{goal}}",
-            f"(Infer from README below)\n\n## README.md\n\n{readme_content}",
-        )
-    else:
-        meta_prompt = meta_prompt.replace(
-            "{{goal}}", "Analyze codebase for refactoring and improvement opportunities"
-        )
-
-    # Include existing tasks context
-    existing_tasks_context = get_existing_tasks_context(tasks_file)
-    meta_prompt = meta_prompt.replace("{{existing_tasks}}", existing_tasks_context)
+    meta_prompt = _build_meta_prompt(
+        meta_prompt_path,
+        tasks_file,
+        _read_text_if_exists(Path("README.md")) or "",
+        fallback_goal="Analyze codebase for refactoring and improvement opportunities",
+    )
 
     # Run Claude for planning with retry
     config, error = run_claude_with_retry(meta_prompt)
@@ -995,24 +1057,13 @@ def suggest(
 
     typer.echo("Analyzing codebase to suggest tasks...")
 
-    # Build the meta-prompt
-    meta_prompt = meta_prompt_path.read_text()
-
-    readme_path = Path("README.md")
-    if readme_path.exists():
-        readme_content = readme_path.read_text()
-        meta_prompt = meta_prompt.replace(
-            "{{goal}}",
-            f"(Infer from README below)\n\n## README.md\n\n{readme_content}",
-        )
-    else:
-        meta_prompt = meta_prompt.replace(
-            "{{goal}}", "Analyze codebase for refactoring and improvement opportunities"
-        )
-
-    # Include existing tasks context
-    existing_tasks_context = get_existing_tasks_context(tasks_file)
-    meta_prompt = meta_prompt.replace("{{existing_tasks}}", existing_tasks_context)
+    # Build the meta-prompt with goal from README if available
+    meta_prompt = _build_meta_prompt(
+        meta_prompt_path,
+        tasks_file,
+        _read_text_if_exists(Path("README.md")) or "",
+        fallback_goal="Analyze codebase for refactoring and improvement opportunities",
+    )
 
     # Run Claude for planning with retry
     config, error = run_claude_with_retry(meta_prompt)
@@ -1114,7 +1165,7 @@ def spec(
     template_content = spec_template_path.read_text()
     # Convert name to title case for display (user-auth -> User Auth)
     display_name = name.replace("-", " ").replace("_", " ").title()
-    spec_content = template_content.replace("{{name}}", display_name)
+    spec_content = render_template(template_content, {"name": display_name})
 
     spec_file.write_text(spec_content)
     typer.echo(f"Created {spec_file}")
@@ -1,11 +1,20 @@
 """Configuration handling for wiggum."""
 
+import re
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+
 CONFIG_FILE = ".wiggum.toml"
 
+_TEMPLATE_PLACEHOLDER_PATTERN = re.compile(r"\{\{(\w+)\}\}")
+
 # Config schema with type information
 # Format: {section: {key: (default_value, expected_type)}}
 CONFIG_SCHEMA: dict[str, dict[str, tuple]] = {
@@ -397,11 +406,6 @@ def read_config() -> dict:
         return {}
 
     try:
-        try:
-            import tomllib
-        except ImportError:
-            import tomli as tomllib
-
         return tomllib.loads(config_path.read_text())
     except Exception:
         return {}
@@ -419,8 +423,13 @@ def write_config(config: dict) -> None:
     config_path.write_text(tomli_w.dumps(config))
 
 
+@lru_cache(maxsize=1)
 def get_templates_dir() -> Path:
-    """Get the templates directory from the package."""
+    """Get the templates directory from the package.
+
+    The package location cannot change within a process, so the lookup is
+    cached.
+    """
     import importlib.resources
 
     return Path(str(importlib.resources.files("wiggum"))) / "templates"
@@ -443,3 +452,21 @@ def resolve_templates_dir(override: Path | None = None) -> Path:
     if local_templates.is_dir() and (local_templates / "LOOP-PROMPT.md").exists():
         return local_templates
     return get_templates_dir()
+
+
+def render_template(template: str, values: dict[str, str]) -> str:
+    """Substitute ``{{name}}`` placeholders in a template in a single pass.
+
+    Substituted values are not rescanned, so content pulled in from user
+    files (such as a README) can't trigger further substitutions.
+
+    Args:
+        template: Template text containing ``{{name}}`` placeholders.
+        values: Mapping of placeholder names to replacement text.
+
+    Returns:
+        Rendered text. Placeholders without a value are left unchanged.
+    """
+    return _TEMPLATE_PLACEHOLDER_PATTERN.sub(
+        lambda m: values.get(m.group(1), m.group(0)), template
+    )
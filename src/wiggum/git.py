@@ -1,6 +1,7 @@
 """Git operations for wiggum."""
 
 import subprocess
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
@@ -8,12 +9,39 @@ DEFAULT_GIT_TIMEOUT_SECONDS = 120
 DEFAULT_GH_TIMEOUT_SECONDS = 120
 
 
+# Repository metadata that doesn't change during a wiggum run, keyed by the
+# resolved working directory. Use clear_cache() to reset (e.g. in tests).
+_IS_GIT_REPO_CACHE: dict[Path, bool] = {}
+_MAIN_BRANCH_CACHE: dict[Path, str] = {}
+_HAS_REMOTE_CACHE: dict[Path, bool] = {}
+
+
 class GitError(Exception):
     """Raised when a git operation fails."""
 
     pass
 
 
+@dataclass
+class RepoInfo:
+    """Snapshot of repository metadata gathered by get_repo_info()."""
+
+    is_repo: bool
+    current_branch: Optional[str] = None  # None when detached or unborn
+
+
+def _cache_key(cwd: Optional[Path]) -> Path:
+    """Get the cache key for a working directory."""
+    return (cwd if cwd is not None else Path.cwd()).resolve()
+
+
+def clear_cache() -> None:
+    """Forget cached repository metadata for all directories."""
+    _IS_GIT_REPO_CACHE.clear()
+    _MAIN_BRANCH_CACHE.clear()
+    _HAS_REMOTE_CACHE.clear()
+
+
 def _run_git(
     args: list[str],
     cwd: Optional[Path] = None,
@@ -61,33 +89,92 @@ def is_git_repo(cwd: Optional[Path] = None) -> bool:
     Returns:
         True if in a git repository, False otherwise.
     """
-    result = _run_git(["rev-parse", "--git-dir"], cwd=cwd, check=False)
-    return result.returncode == 0
+    key = _cache_key(cwd)
+    if key not in _IS_GIT_REPO_CACHE:
+        result = _run_git(["rev-parse", "--git-dir"], cwd=cwd, check=False)
+        _IS_GIT_REPO_CACHE[key] = result.returncode == 0
+    return _IS_GIT_REPO_CACHE[key]
 
 
 def get_main_branch_name(cwd: Optional[Path] = None) -> str:
-    """Detect the main branch name (main or master).
+    """Detect the main branch name.
+
+    Uses the remote's default branch (``origin/HEAD``) when it is known,
+    otherwise falls back to whichever of 'main' or 'master' exists locally.
 
     Args:
         cwd: Working directory.
 
     Returns:
-        The name of the main branch ('main' or 'master').
+        The name of the main branch (typically 'main' or 'master').
 
     Raises:
-        GitError: If neither 'main' nor 'master' branch exists.
+        GitError: If there is no origin/HEAD and neither 'main' nor 'master'
+            branch exists.
     """
-    # Check if 'main' branch exists
-    result = _run_git(["rev-parse", "--verify", "main"], cwd=cwd, check=False)
-    if result.returncode == 0:
-        return "main"
+    key = _cache_key(cwd)
+    if key in _MAIN_BRANCH_CACHE:
+        return _MAIN_BRANCH_CACHE[key]
+
+    # The remote's default branch is authoritative when it has been fetched
+    result = _run_git(
+        ["symbolic-ref", "--short", "refs/remotes/origin/HEAD"], cwd=cwd, check=False
+    )
+    branch = result.stdout.strip().removeprefix("origin/")
+    if result.returncode != 0 or not branch:
+        # List both candidates in one call; 'main' is preferred over 'master'
+        result = _run_git(
+            [
+                "for-each-ref",
+                "--format=%(refname:short)",
+                "refs/heads/main",
+                "refs/heads/master",
+            ],
+            cwd=cwd,
+            check=False,
+        )
+        local = result.stdout.split()
+        branch = next((b for b in ("main", "master") if b in local), "")
 
-    # Check if 'master' branch exists
-    result = _run_git(["rev-parse", "--verify", "master"], cwd=cwd, check=False)
-    if result.returncode == 0:
-        return "master"
+    if not branch:
+        raise GitError(
+            "Could not detect main branch (neither 'main' nor 'master' exists)"
+        )
+
+    _MAIN_BRANCH_CACHE[key] = branch
+    return branch
+
+
+def get_repo_info(cwd: Optional[Path] = None) -> RepoInfo:
+    """Gather repository metadata with a single git invocation.
+
+    One ``git for-each-ref`` over local branches answers whether this is a
+    repository and which branch is checked out. The main branch and remote
+    are left to the cached get_main_branch_name() and has_remote(), so
+    callers only pay for them when they need them.
+
+    Args:
+        cwd: Working directory.
+
+    Returns:
+        RepoInfo for the repository. If cwd is not a git repository,
+        is_repo is False and current_branch is None.
+    """
+    result = _run_git(
+        ["for-each-ref", "--format=%(HEAD) %(refname:short)", "refs/heads/"],
+        cwd=cwd,
+        check=False,
+    )
+    _IS_GIT_REPO_CACHE[_cache_key(cwd)] = result.returncode == 0
+    if result.returncode != 0:
+        return RepoInfo(is_repo=False)
 
-    raise GitError("Could not detect main branch (neither 'main' nor 'master' exists)")
+    # Each line is "<HEAD marker> <branch>", the marker being "*" or " "
+    current_branch = next(
+        (line[2:] for line in result.stdout.splitlines() if line.startswith("*")),
+        None,
+    )
+    return RepoInfo(is_repo=True, current_branch=current_branch)
 
 
 def get_current_branch(cwd: Optional[Path] = None) -> str:
@@ -195,8 +282,11 @@ def has_remote(cwd: Optional[Path] = None) -> bool:
     Returns:
         True if a remote is configured, False otherwise.
     """
-    result = _run_git(["remote"], cwd=cwd, check=False)
-    return bool(result.stdout.strip())
+    key = _cache_key(cwd)
+    if key not in _HAS_REMOTE_CACHE:
+        result = _run_git(["remote"], cwd=cwd, check=False)
+        _HAS_REMOTE_CACHE[key] = bool(result.stdout.strip())
+    return _HAS_REMOTE_CACHE[key]
 
 
 def create_branch(branch_name: str, cwd: Optional[Path] = None) -> None:
@@ -1,5 +1,6 @@
 """Learning diary operations for wiggum sessions."""
 
+import re
 from pathlib import Path
 from typing import Optional
 
@@ -9,6 +10,10 @@ from wiggum.config import resolve_templates_dir
 DEFAULT_DIARY_DIR = Path(".wiggum")
 DEFAULT_DIARY_FILENAME = "session-diary.md"
 
+_DELIMITER = "=" * 40
+_LINE_COUNT_CHUNK_SIZE = 64 * 1024
+_CONSOLIDATE_PLACEHOLDER_PATTERN = re.compile(r"\{(diary_content|claude_md_content)\}")
+
 
 def _get_diary_dir(base_path: Optional[Path] = None) -> Path:
     """Get the diary directory path."""
@@ -33,12 +38,11 @@ def sanitize_for_prompt(content: str, label: str) -> str:
     Returns:
         The content wrapped in labeled delimiters.
     """
-    delimiter = "=" * 40
     return f"""
 <{label}>
-{delimiter}
+{_DELIMITER}
 {content}
-{delimiter}
+{_DELIMITER}
 </{label}>
 """
 
@@ -53,30 +57,37 @@ def ensure_diary_dir(base_path: Optional[Path] = None) -> None:
 
 def has_diary_content(base_path: Optional[Path] = None) -> bool:
     """Check if diary exists and has content beyond whitespace."""
-    diary_path = _get_diary_path(base_path)
-    if not diary_path.exists():
-        return False
-    try:
-        return bool(diary_path.read_text().strip())
-    except OSError:
-        return False
+    return bool(read_diary(base_path).strip())
 
 
 def read_diary(base_path: Optional[Path] = None) -> str:
     """Read diary content, or empty string if no diary exists."""
-    diary_path = _get_diary_path(base_path)
-    if not diary_path.exists():
-        return ""
     try:
-        return diary_path.read_text()
-    except OSError:
+        return _get_diary_path(base_path).read_text()
+    except OSError:  # Includes FileNotFoundError when there is no diary
         return ""
 
 
 def get_diary_line_count(base_path: Optional[Path] = None) -> int:
-    """Get the number of lines in the diary file, or 0 if no diary exists."""
-    content = read_diary(base_path)
-    return len(content.splitlines()) if content else 0
+    """Get the number of lines in the diary file, or 0 if no diary exists.
+
+    Lines are LF-delimited, so CRLF files count the same as LF files, but a
+    lone CR (or a Unicode line separator) doesn't start a new line.
+    """
+    # Count newlines in binary chunks rather than decoding and splitting the
+    # whole diary; a final line without a trailing newline still counts.
+    count = 0
+    last_chunk = b""
+    try:
+        with _get_diary_path(base_path).open("rb") as f:
+            while chunk := f.read(_LINE_COUNT_CHUNK_SIZE):
+                count += chunk.count(b"\n")
+                last_chunk = chunk
+    except OSError:
+        return 0
+    if last_chunk and not last_chunk.endswith(b"\n"):
+        count += 1
+    return count
 
 
 def clear_diary(base_path: Optional[Path] = None) -> None:
@@ -93,10 +104,10 @@ def consolidate_learnings(
 
     Returns (True, None) on success, or (False, reason) on failure.
     """
-    if not has_diary_content(base_path):
+    diary_content = read_diary(base_path)
+    if not diary_content.strip():
         return False, "no diary content"
 
-    diary_content = read_diary(base_path)
     claude_md_path = Path("CLAUDE.md") if base_path is None else base_path / "CLAUDE.md"
     claude_md_content = claude_md_path.read_text() if claude_md_path.exists() else ""
 
@@ -109,14 +120,14 @@ def consolidate_learnings(
 
     # Build the consolidation prompt with sanitized content
     prompt_template = consolidate_template_path.read_text()
-    prompt = prompt_template.replace(
-        "{diary_content}", sanitize_for_prompt(diary_content, "diary-content")
-    )
-    prompt = prompt.replace(
-        "{claude_md_content}",
-        sanitize_for_prompt(
+    replacements = {
+        "diary_content": sanitize_for_prompt(diary_content, "diary-content"),
+        "claude_md_content": sanitize_for_prompt(
             claude_md_content or "(No CLAUDE.md exists)", "claude-md-content"
         ),
+    }
+    prompt = _CONSOLIDATE_PLACEHOLDER_PATTERN.sub(
+        lambda m: replacements[m.group(1)], prompt_template
     )
 
     # Run the agent
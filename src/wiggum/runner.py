@@ -1,5 +1,7 @@
 """Runner utilities for wiggum."""
 
+import os
+import signal
 import subprocess
 from pathlib import Path
 from typing import Optional, Tuple
@@ -83,22 +85,54 @@ def run_claude_for_planning(
     if not check_cli_available("claude"):
         return None, get_cli_error_message("claude")
 
-    try:
-        result = subprocess.run(
-            ["claude", "--print", "-p", meta_prompt],
-            capture_output=True,
-            text=True,
-            check=False,
-            timeout=timeout_seconds,
+    # Run Claude in its own session so a timeout can kill the whole process
+    # group; killing only the direct child would orphan anything it spawned
+    with subprocess.Popen(
+        ["claude", "--print", "-p", meta_prompt],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        # Decode the complete output once; invalid bytes must not abort planning
+        encoding="utf-8",
+        errors="replace",
+        start_new_session=True,
+    ) as proc:
+        try:
+            stdout, stderr = proc.communicate(timeout=timeout_seconds)
+        except subprocess.TimeoutExpired:
+            _kill_process_group(proc)
+            proc.communicate()
+            return None, f"Claude planning command timed out after {timeout_seconds}s"
+        except BaseException:
+            # In its own session Claude never sees a terminal Ctrl-C, so take
+            # it down before propagating (as subprocess.run does for its child)
+            _kill_process_group(proc)
+            raise
+
+    if proc.returncode != 0:
+        stderr = (stderr or "").strip()
+        detail = f": {stderr}" if stderr else ""
+        return (
+            None,
+            f"Claude planning command failed with exit code {proc.returncode}{detail}",
         )
-    except subprocess.TimeoutExpired:
-        return None, f"Claude planning command timed out after {timeout_seconds}s"
+    return stdout, None
 
-    if result.returncode != 0:
-        stderr = (result.stderr or "").strip()
-        detail = f": {stderr}" if stderr else ""
-        return None, f"Claude planning command failed with exit code {result.returncode}{detail}"
-    return result.stdout, None
+
+def _kill_process_group(proc: subprocess.Popen[str]) -> None:
+    """Kill a process started with start_new_session=True, with its children.
+
+    Falls back to killing just the process where the group can't be
+    signalled, e.g. on Windows. The caller is responsible for reaping it.
+    """
+    if hasattr(os, "killpg"):
+        try:
+            # The session leader's pid is also its process group id
+            os.killpg(proc.pid, signal.SIGKILL)
+        except OSError:
+            # The group is already gone (or macOS refuses a zombie group)
+            proc.kill()
+    else:
+        proc.kill()
 
 
 def get_file_changes() -> tuple[bool, str]:
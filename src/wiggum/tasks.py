@@ -14,7 +14,7 @@ class TaskList:
     done: list[str] = field(default_factory=list)
 
 
-_TASK_BOX_PATTERN = re.compile(r"^- \[ \]", re.MULTILINE)
+_TASK_BOX_PREFIX = "- [ ]"
 _TASK_TODO_PATTERN = re.compile(r"^- \[ \] (.+)$", re.MULTILINE)
 _TASK_DONE_PATTERN = re.compile(r"^- \[[xX]\] (.+)$", re.MULTILINE)
 _TASK_ANY_PATTERN = re.compile(r"^- \[[x ]\] (.+)$", re.MULTILINE | re.IGNORECASE)
@@ -39,15 +39,13 @@ def _extract_section(content: str, section_name: str) -> str:
 
 def tasks_remaining(tasks_file: Path = Path("TODO.md")) -> bool:
     """Check if there are incomplete tasks in TODO.md."""
-    if not tasks_file.exists():
+    # Stream the file and stop at the first unchecked box: - [ ]
+    try:
+        with tasks_file.open() as f:
+            return any(line.startswith(_TASK_BOX_PREFIX) for line in f)
+    except FileNotFoundError:
         return True  # No tasks file means we don't know, keep running
 
-    content = tasks_file.read_text()
-    # Count unchecked boxes in Todo section
-
-    # Find unchecked tasks: - [ ]
-    return _TASK_BOX_PATTERN.search(content) is not None
-
 
 def get_current_task(tasks_file: Path = Path("TODO.md")) -> Optional[str]:
     """Get the first incomplete task from TODO.md.
@@ -58,18 +56,38 @@ def get_current_task(tasks_file: Path = Path("TODO.md")) -> Optional[str]:
     Returns:
         The task description (without the checkbox), or None if no tasks remain.
     """
-    if not tasks_file.exists():
-        return None
+    return get_task_status(tasks_file)[1]
 
-    content = tasks_file.read_text()
-    if not content:
-        return None
 
-    # Find first unchecked task: - [ ] task description
-    match = _TASK_TODO_PATTERN.search(content)
-    if match:
-        return match.group(1).strip()
-    return None
+def get_task_status(
+    tasks_file: Path = Path("TODO.md"),
+) -> tuple[bool, Optional[str]]:
+    """Check for remaining tasks and get the current one with a single read.
+
+    Equivalent to calling ``tasks_remaining`` and ``get_current_task``, but
+    reads the file once, line by line, stopping at the first incomplete
+    task. Used by the run loop, which needs both every iteration.
+
+    Args:
+        tasks_file: Path to the tasks file.
+
+    Returns:
+        Tuple of (tasks_remaining, current_task).
+    """
+    remaining = False
+    try:
+        with tasks_file.open() as f:
+            for line in f:
+                if not line.startswith(_TASK_BOX_PREFIX):
+                    continue
+                remaining = True
+                # Find first unchecked task: - [ ] task description
+                match = _TASK_TODO_PATTERN.match(line)
+                if match:
+                    return True, match.group(1).strip()
+    except FileNotFoundError:
+        return True, None
+    return remaining, None
 
 
 def get_existing_tasks_context(tasks_file: Path) -> str:
@@ -1,9 +1,11 @@
 """Upgrade logic for wiggum managed files."""
 
+import locale
 import re
 from pathlib import Path
 from typing import Optional
 
+from wiggum.config import CONFIG_FILE
 
 # Config schema - all known config options with defaults
 WIGGUM_CONFIG_DEFAULTS = {
@@ -21,6 +23,28 @@ WIGGUM_CONFIG_DEFAULTS = {
     "learning": {"enabled": True, "keep_diary": False, "auto_consolidate": True},
 }
 
+# Defaults flattened to (section, key, default) in schema order
+_DEFAULTS_FLAT: tuple[tuple[str, str, object], ...] = tuple(
+    (section, key, default)
+    for section, options in WIGGUM_CONFIG_DEFAULTS.items()
+    for key, default in options.items()
+)
+
+_TEMPLATE_VERSION_PATTERN = re.compile(
+    r"<!--\s*wiggum-template:\s*(\d+\.\d+\.\d+)\s*-->"
+)
+
+# Legacy root-anchored .gitignore entries for the pre-TODO.md task files
+_GITIGNORE_LEGACY_ENTRY_PATTERN = re.compile(r"^/(?:TASKS|DONE)\.md\n", re.MULTILINE)
+
+# Files touched by the TASKS.md -> TODO.md migration (relative to cwd)
+_TASKS_PATH = Path("TASKS.md")
+_TODO_PATH = Path("TODO.md")
+_GITIGNORE_PATH = Path(".gitignore")
+_CONFIG_PATH = Path(CONFIG_FILE)
+
+_LEGACY_TASKS_FILE_SETTING = 'tasks_file = "TASKS.md"'
+
 
 def extract_template_version(content: str) -> Optional[str]:
     """Extract version from template file.
@@ -33,12 +57,17 @@ def extract_template_version(content: str) -> Optional[str]:
     Returns:
         Version string if found, None otherwise.
     """
-    match = re.search(r"<!--\s*wiggum-template:\s*(\d+\.\d+\.\d+)\s*-->", content)
+    match = _TEMPLATE_VERSION_PATTERN.search(content)
     if match:
         return match.group(1)
     return None
 
 
+def _parse_version(version: str) -> tuple[int, ...]:
+    """Parse a dotted version string like '1.2.3' into a comparable tuple."""
+    return tuple(map(int, version.split(".")))
+
+
 def is_version_outdated(current: Optional[str], target: str) -> bool:
     """Check if current version is older than target.
 
@@ -52,12 +81,8 @@ def is_version_outdated(current: Optional[str], target: str) -> bool:
     if current is None:
         return True
 
-    def parse_version(v: str) -> tuple:
-        parts = v.split(".")
-        return tuple(int(p) for p in parts)
-
     try:
-        return parse_version(current) < parse_version(target)
+        return _parse_version(current) < _parse_version(target)
     except (ValueError, AttributeError):
         return True
 
@@ -72,11 +97,11 @@ def get_missing_config_options(existing: dict) -> list[tuple[str, str, object]]:
         List of (section, key, default_value) tuples for missing options.
     """
     missing = []
-    for section, options in WIGGUM_CONFIG_DEFAULTS.items():
-        existing_section = existing.get(section, {})
-        for key, default in options.items():
-            if key not in existing_section:
-                missing.append((section, key, default))
+    for section, key, default in _DEFAULTS_FLAT:
+        options = existing.get(section, {})
+        # A section set to a non-table value is the user's to fix; don't touch it
+        if isinstance(options, dict) and key not in options:
+            missing.append((section, key, default))
     return missing
 
 
@@ -90,26 +115,27 @@ def merge_config_with_defaults(existing: dict) -> dict:
         Merged configuration with all defaults filled in.
     """
     merged = {}
-    for section, options in WIGGUM_CONFIG_DEFAULTS.items():
-        existing_section = existing.get(section, {})
-        merged[section] = {}
-        for key, default in options.items():
-            # Preserve existing value, use default if missing
-            if key in existing_section:
-                merged[section][key] = existing_section[key]
-            else:
-                merged[section][key] = default
-    # Preserve any unknown sections/keys (user extensions)
+    for section, defaults in WIGGUM_CONFIG_DEFAULTS.items():
+        options = existing.get(section, {})
+        if isinstance(options, dict):
+            # Existing values override defaults; unknown keys (user extensions)
+            # are kept after the default keys, in their original order
+            merged[section] = {**defaults, **options}
+        else:
+            # Not a table (e.g. loop = 1): keep the user's value as-is
+            merged[section] = options
+    # Preserve any unknown sections (user extensions)
     for section, options in existing.items():
         if section not in merged:
             merged[section] = options
-        elif isinstance(options, dict):
-            for key, value in options.items():
-                if key not in merged[section]:
-                    merged[section][key] = value
     return merged
 
 
+def _task_sections_present(content: str) -> tuple[bool, bool]:
+    """Report whether the Done and Todo sections appear in TODO.md content."""
+    return "## Done" in content, "## Todo" in content
+
+
 def tasks_file_needs_upgrade(content: str) -> bool:
     """Check if TODO.md needs structural upgrade.
 
@@ -119,11 +145,8 @@ def tasks_file_needs_upgrade(content: str) -> bool:
     Returns:
         True if file is missing required sections.
     """
-    required_sections = ["## Todo", "## Done"]
-    for section in required_sections:
-        if section not in content:
-            return True
-    return False
+    has_done, has_todo = _task_sections_present(content)
+    return not (has_done and has_todo)
 
 
 def add_missing_task_sections(content: str) -> str:
@@ -135,51 +158,57 @@ def add_missing_task_sections(content: str) -> str:
     Returns:
         Content with missing sections added.
     """
-    lines = content.split("\n")
-    has_todo = any("## Todo" in line for line in lines)
-    has_done = any("## Done" in line for line in lines)
+    has_done, has_todo = _task_sections_present(content)
 
     # If both exist, return unchanged
     if has_todo and has_done:
         return content
 
-    # Build new content preserving existing structure
-    new_lines = []
-    inserted_header = False
-
-    for line in lines:
-        # Ensure we have the header
-        if line.startswith("# ") and not inserted_header:
-            new_lines.append(line)
-            new_lines.append("")
-            if not has_done:
-                new_lines.append("## Done")
-                new_lines.append("")
-            if not has_todo:
-                new_lines.append("## Todo")
-                new_lines.append("")
-            inserted_header = True
-        elif line == "## Done" or line == "## Todo":
-            new_lines.append(line)
-        else:
-            new_lines.append(line)
-
-    # If no header was found, add structure at the top
-    if not inserted_header:
-        result = ["# Tasks", ""]
-        if not has_done:
-            result.extend(["## Done", ""])
-        if not has_todo:
-            result.extend(["## Todo", ""])
-        result.extend(lines)
-        return "\n".join(result)
-
-    return "\n".join(new_lines)
+    sections = []
+    if not has_done:
+        sections.extend(["## Done", ""])
+    if not has_todo:
+        sections.extend(["## Todo", ""])
+
+    # Locate the first top-level "# " header line
+    if content.startswith("# "):
+        header_start = 0
+    else:
+        header_start = content.find("\n# ")
+        if header_start == -1:
+            # No header found, add structure at the top
+            return "\n".join(["# Tasks", "", *sections]) + "\n" + content
+        header_start += 1
+
+    # Splice the missing sections in right after the header line
+    block = "\n".join(["", *sections])
+    header_end = content.find("\n", header_start)
+    if header_end == -1:
+        return content + "\n" + block
+    return content[:header_end] + "\n" + block + "\n" + content[header_end + 1 :]
 
 
 def needs_tasks_rename() -> bool:
     """Check if TASKS.md exists without TODO.md (needs migration)."""
-    return Path("TASKS.md").exists() and not Path("TODO.md").exists()
+    return _TASKS_PATH.exists() and not _TODO_PATH.exists()
+
+
+def _read_bytes_if_exists(path: Path) -> Optional[bytes]:
+    """Read a file's bytes with a single open, or None if it doesn't exist."""
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def _decode_text(raw: bytes) -> str:
+    """Decode file bytes the way Path.read_text() would.
+
+    Uses the locale's preferred encoding and universal newlines, so
+    ``\r\n`` and a lone ``\r`` both become ``\n``.
+    """
+    text = raw.decode(locale.getpreferredencoding(False))
+    return text.replace("\r\n", "\n").replace("\r", "\n")
 
 
 def migrate_tasks_to_todo() -> list[str]:
@@ -189,34 +218,29 @@ def migrate_tasks_to_todo() -> list[str]:
         List of actions taken.
     """
     actions = []
-    tasks_path = Path("TASKS.md")
-    todo_path = Path("TODO.md")
 
-    if tasks_path.exists() and not todo_path.exists():
-        tasks_path.rename(todo_path)
+    if needs_tasks_rename():
+        _TASKS_PATH.rename(_TODO_PATH)
         actions.append("Renamed TASKS.md → TODO.md")
 
     # Clean up .gitignore: remove /TASKS.md and /DONE.md entries
-    gitignore_path = Path(".gitignore")
-    if gitignore_path.exists():
-        content = gitignore_path.read_text()
-        new_content = content
-        for entry in ["/TASKS.md\n", "/DONE.md\n"]:
-            new_content = new_content.replace(entry, "")
+    # (files are checked as bytes first so untouched files are never decoded)
+    raw = _read_bytes_if_exists(_GITIGNORE_PATH) or b""
+    if b"/TASKS.md" in raw or b"/DONE.md" in raw:
+        content = _decode_text(raw)
+        new_content = _GITIGNORE_LEGACY_ENTRY_PATTERN.sub("", content)
         if new_content != content:
-            gitignore_path.write_text(new_content)
+            _GITIGNORE_PATH.write_text(new_content)
             actions.append("Removed /TASKS.md and /DONE.md from .gitignore")
 
     # Update .wiggum.toml if it has tasks_file = "TASKS.md"
-    config_path = Path(".wiggum.toml")
-    if config_path.exists():
-        config_content = config_path.read_text()
-        if 'tasks_file = "TASKS.md"' in config_content:
-            new_config = config_content.replace(
-                'tasks_file = "TASKS.md"', 'tasks_file = "TODO.md"'
-            )
-            config_path.write_text(new_config)
-            actions.append('Updated .wiggum.toml: tasks_file = "TODO.md"')
+    raw = _read_bytes_if_exists(_CONFIG_PATH) or b""
+    if _LEGACY_TASKS_FILE_SETTING.encode() in raw:
+        new_config = _decode_text(raw).replace(
+            _LEGACY_TASKS_FILE_SETTING, 'tasks_file = "TODO.md"'
+        )
+        _CONFIG_PATH.write_text(new_config)
+        actions.append('Updated .wiggum.toml: tasks_file = "TODO.md"')
 
     return actions
 
@@ -236,10 +260,9 @@ def get_next_backup_path(path: Path) -> Path:
     if not backup.exists():
         return backup
 
-    # Try numbered backups
+    # Use the first free numbered backup; probing with exists() follows the
+    # filesystem's own case rules, and usually takes only a stat or two
     counter = 1
-    while True:
-        numbered_backup = Path(f"{backup}.{counter}")
-        if not numbered_backup.exists():
-            return numbered_backup
+    while Path(f"{backup}.{counter}").exists():
         counter += 1
+    return Path(f"{backup}.{counter}")
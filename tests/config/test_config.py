@@ -597,8 +597,9 @@ class TestConfigSchemaValidation:
         result = runner.invoke(app, ["run", "--dry-run"])
 
         assert result.exit_code == 0
-        assert "unknown_section" in result.output.lower()
-        assert "warning" in result.output.lower() or "unknown" in result.output.lower()
+        output = result.output.lower()
+        assert "unknown_section" in output
+        assert "warning" in output or "unknown" in output
 
     def test_unknown_key_in_known_section_shows_warning(self, tmp_path: Path) -> None:
         """Unknown key in known section should show warning."""
@@ -617,8 +618,9 @@ class TestConfigSchemaValidation:
 
         assert result.exit_code == 1
         # Should mention the invalid agent and suggest valid ones
-        assert "claud" in result.output.lower()
-        assert "claude" in result.output.lower()
+        output = result.output.lower()
+        assert "claud" in output
+        assert "claude" in output
 
     def test_invalid_agent_lists_available_agents(self, tmp_path: Path) -> None:
         """Invalid agent name should list all available agents."""
@@ -731,3 +733,34 @@ class TestMutuallyExclusiveHelper:
 
         assert "--alpha" in str(exc_info.value)
         assert "--beta" in str(exc_info.value)
+
+
+class TestRenderTemplate:
+    """Tests for render_template placeholder substitution."""
+
+    def test_substitutes_all_placeholders(self) -> None:
+        """Every known placeholder is replaced."""
+        from wiggum.config import render_template
+
+        result = render_template(
+            "Goal: {{goal}}\nTasks: {{tasks}}", {"goal": "ship", "tasks": "- [ ] a"}
+        )
+
+        assert result == "Goal: ship\nTasks: - [ ] a"
+
+    def test_leaves_unknown_placeholders(self) -> None:
+        """Placeholders without a value are kept as-is."""
+        from wiggum.config import render_template
+
+        assert render_template("{{goal}} {{other}}", {"goal": "x"}) == "x {{other}}"
+
+    def test_does_not_rescan_substituted_values(self) -> None:
+        """Placeholders inside substituted content are not expanded again."""
+        from wiggum.config import render_template
+
+        result = render_template(
+            "{{goal}}\n{{existing_tasks}}",
+            {"goal": "README mentions {{existing_tasks}}", "existing_tasks": "TASKS"},
+        )
+
+        assert result == "README mentions {{existing_tasks}}\nTASKS"
@@ -0,0 +1,64 @@
+"""Shared pytest fixtures for wiggum tests."""
+
+import shutil
+import subprocess
+from pathlib import Path
+
+import click
+import pytest
+import typer
+
+from wiggum import git
+from wiggum.cli import app
+
+
+@pytest.fixture(autouse=True)
+def clear_git_cache():
+    """Reset cached git metadata so results don't leak between tests."""
+    git.clear_cache()
+    yield
+    git.clear_cache()
+
+
+@pytest.fixture(scope="session")
+def cli() -> click.Command:
+    """The wiggum app as a Click command, built once instead of per invoke."""
+    return typer.main.get_command(app)
+
+
+@pytest.fixture(scope="session")
+def _git_repo_template(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Build a minimal git repo (one commit on 'main') once per session."""
+    repo = tmp_path_factory.mktemp("git-repo-template")
+    subprocess.run(
+        ["git", "init", "-b", "main"],
+        cwd=repo,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    subprocess.run(
+        [
+            "git",
+            "-c",
+            "user.email=test@test.com",
+            "-c",
+            "user.name=Test",
+            "commit",
+            "--allow-empty",
+            "-m",
+            "init",
+        ],
+        cwd=repo,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return repo
+
+
+@pytest.fixture
+def git_repo(tmp_path: Path, _git_repo_template: Path) -> Path:
+    """Copy the session template repo into tmp_path and return it."""
+    shutil.copytree(_git_repo_template, tmp_path, dirs_exist_ok=True)
+    return tmp_path
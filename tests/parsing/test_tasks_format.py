@@ -2,7 +2,7 @@
 
 from pathlib import Path
 
-from wiggum.cli import get_current_task, tasks_remaining
+from wiggum.tasks import get_current_task, get_task_status, tasks_remaining
 
 
 class TestTasksParser:
@@ -60,3 +60,30 @@ class TestTasksParser:
         )
         result = get_current_task(tasks_file)
         assert result is None
+
+
+class TestGetTaskStatus:
+    """Tests for the combined get_task_status helper."""
+
+    def test_returns_remaining_and_current_task(self, tmp_path: Path) -> None:
+        """get_task_status reports pending work and the first incomplete task."""
+        tasks_file = tmp_path / "TODO.md"
+        tasks_file.write_text(
+            "# Tasks\n\n"
+            "## Done\n\n"
+            "- [x] Already finished\n\n"
+            "## Todo\n\n"
+            "- [ ] First pending task\n"
+            "- [ ] Second pending task\n"
+        )
+        assert get_task_status(tasks_file) == (True, "First pending task")
+
+    def test_all_complete(self, tmp_path: Path) -> None:
+        """get_task_status reports no remaining tasks when all are done."""
+        tasks_file = tmp_path / "TODO.md"
+        tasks_file.write_text("# Tasks\n\n## Done\n\n- [x] Completed task 1\n")
+        assert get_task_status(tasks_file) == (False, None)
+
+    def test_missing_file_keeps_running(self, tmp_path: Path) -> None:
+        """get_task_status matches tasks_remaining when the file is missing."""
+        assert get_task_status(tmp_path / "TODO.md") == (True, None)
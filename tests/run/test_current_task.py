@@ -1,11 +1,14 @@
 """Tests for displaying current task at iteration start."""
 
 from pathlib import Path
+from typing import Optional
 from unittest.mock import MagicMock, patch
 
+import pytest
 from typer.testing import CliRunner
 
-from wiggum.cli import app, get_current_task
+from wiggum.cli import app
+from wiggum.tasks import get_current_task
 
 runner = CliRunner()
 
@@ -13,21 +16,53 @@ runner = CliRunner()
 class TestGetCurrentTask:
     """Tests for the get_current_task function."""
 
-    def test_returns_first_incomplete_task(self, tmp_path: Path) -> None:
-        """Returns the first task marked with - [ ]."""
+    @pytest.mark.parametrize(
+        ("tasks_md", "expected"),
+        [
+            pytest.param(
+                "# Tasks\n\n## Todo\n\n- [ ] First task\n- [ ] Second task\n",
+                "First task",
+                id="first-incomplete",
+            ),
+            pytest.param(
+                "# Tasks\n\n## Done\n\n- [x] Completed task\n",
+                None,
+                id="all-complete",
+            ),
+            pytest.param("", None, id="empty-file"),
+            pytest.param(
+                "# Tasks\n\n"
+                "## Done\n\n"
+                "- [x] Completed task 1\n"
+                "- [x] Completed task 2\n\n"
+                "## Todo\n\n"
+                "- [ ] First incomplete task\n",
+                "First incomplete task",
+                id="skips-completed",
+            ),
+            pytest.param(
+                "# Tasks\n\n## Todo\n\n- [ ] Main task description\n",
+                "Main task description",
+                id="first-line-only",
+            ),
+            pytest.param(
+                "# Tasks\n\n"
+                "## In Progress\n\n"
+                "- [ ] Currently working on this\n\n"
+                "## Todo\n\n"
+                "- [ ] Next task\n",
+                "Currently working on this",
+                id="in-progress-section",
+            ),
+        ],
+    )
+    def test_selects_first_incomplete_task(
+        self, tmp_path: Path, tasks_md: str, expected: Optional[str]
+    ) -> None:
+        """Returns the first task marked with - [ ] in file order, or None."""
         tasks_file = tmp_path / "TODO.md"
-        tasks_file.write_text(
-            "# Tasks\n\n## Todo\n\n- [ ] First task\n- [ ] Second task\n"
-        )
-        result = get_current_task(tasks_file)
-        assert result == "First task"
-
-    def test_returns_none_when_all_complete(self, tmp_path: Path) -> None:
-        """Returns None when all tasks are completed."""
-        tasks_file = tmp_path / "TODO.md"
-        tasks_file.write_text("# Tasks\n\n## Done\n\n- [x] Completed task\n")
-        result = get_current_task(tasks_file)
-        assert result is None
+        tasks_file.write_text(tasks_md)
+        assert get_current_task(tasks_file) == expected
 
     def test_returns_none_when_file_missing(self, tmp_path: Path) -> None:
         """Returns None when tasks file doesn't exist."""
@@ -35,48 +70,6 @@ class TestGetCurrentTask:
         result = get_current_task(tasks_file)
         assert result is None
 
-    def test_returns_none_for_empty_file(self, tmp_path: Path) -> None:
-        """Returns None when tasks file is empty."""
-        tasks_file = tmp_path / "TODO.md"
-        tasks_file.write_text("")
-        result = get_current_task(tasks_file)
-        assert result is None
-
-    def test_skips_completed_tasks(self, tmp_path: Path) -> None:
-        """Returns first incomplete task, skipping completed ones."""
-        tasks_file = tmp_path / "TODO.md"
-        tasks_file.write_text(
-            "# Tasks\n\n"
-            "## Done\n\n"
-            "- [x] Completed task 1\n"
-            "- [x] Completed task 2\n\n"
-            "## Todo\n\n"
-            "- [ ] First incomplete task\n"
-        )
-        result = get_current_task(tasks_file)
-        assert result == "First incomplete task"
-
-    def test_handles_multiline_task_descriptions(self, tmp_path: Path) -> None:
-        """Returns only the first line of a task description."""
-        tasks_file = tmp_path / "TODO.md"
-        tasks_file.write_text("# Tasks\n\n## Todo\n\n- [ ] Main task description\n")
-        result = get_current_task(tasks_file)
-        assert result == "Main task description"
-
-    def test_handles_in_progress_section(self, tmp_path: Path) -> None:
-        """Tasks in 'In Progress' section are treated as current task."""
-        tasks_file = tmp_path / "TODO.md"
-        tasks_file.write_text(
-            "# Tasks\n\n"
-            "## In Progress\n\n"
-            "- [ ] Currently working on this\n\n"
-            "## Todo\n\n"
-            "- [ ] Next task\n"
-        )
-        result = get_current_task(tasks_file)
-        # Should return the first incomplete task found
-        assert result == "Currently working on this"
-
 
 class TestRunDisplaysCurrentTask:
     """Integration tests for displaying current task during run."""
@@ -4,14 +4,29 @@ The only stop condition is TODO.md checkmarks (besides max iterations).
 """
 
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+from unittest.mock import patch
 
+import pytest
 from typer.testing import CliRunner
 
-from wiggum.cli import app, tasks_remaining
+from wiggum.cli import app
+from wiggum.tasks import tasks_remaining
 
 runner = CliRunner()
 
+# Tasks files with both tasks still open and with both checked off
+_TWO_OPEN_TASKS = "# Tasks\n\n## Todo\n\n- [ ] task1\n- [ ] task2\n"
+_TWO_DONE_TASKS = "# Tasks\n\n## Done\n\n- [x] task1\n- [x] task2\n"
+
+
+@pytest.fixture
+def prompt_file(tmp_path: Path) -> Path:
+    """Write a minimal loop prompt file under tmp_path."""
+    prompt_file = tmp_path / "LOOP-PROMPT.md"
+    prompt_file.write_text("test prompt")
+    return prompt_file
+
 
 class TestTasksRemaining:
     """Tests for the tasks_remaining function."""
@@ -19,13 +34,13 @@ class TestTasksRemaining:
     def test_tasks_remaining_true_when_unchecked_tasks(self, tmp_path: Path) -> None:
         """Returns True when there are unchecked task boxes."""
         tasks_file = tmp_path / "TODO.md"
-        tasks_file.write_text("# Tasks\n\n## Todo\n\n- [ ] task1\n- [ ] task2\n")
+        tasks_file.write_text(_TWO_OPEN_TASKS)
         assert tasks_remaining(tasks_file) is True
 
     def test_tasks_remaining_false_when_all_complete(self, tmp_path: Path) -> None:
         """Returns False when all tasks are checked."""
         tasks_file = tmp_path / "TODO.md"
-        tasks_file.write_text("# Tasks\n\n## Done\n\n- [x] task1\n- [x] task2\n")
+        tasks_file.write_text(_TWO_DONE_TASKS)
         assert tasks_remaining(tasks_file) is False
 
     def test_tasks_remaining_true_when_file_missing(self, tmp_path: Path) -> None:
@@ -46,13 +61,11 @@ class TestRunStopsOnTasksComplete:
     """Tests that run command stops when all tasks in TODO.md are complete."""
 
     def test_run_exits_immediately_when_all_tasks_complete(
-        self, tmp_path: Path
+        self, tmp_path: Path, prompt_file: Path
     ) -> None:
         """The loop exits without running if all tasks are already complete."""
-        prompt_file = tmp_path / "LOOP-PROMPT.md"
-        prompt_file.write_text("test prompt")
         tasks_file = tmp_path / "TODO.md"
-        tasks_file.write_text("# Tasks\n\n## Done\n\n- [x] task1\n- [x] task2\n")
+        tasks_file.write_text(_TWO_DONE_TASKS)
 
         with patch("wiggum.agents.check_cli_available", return_value=True):
 
@@ -79,10 +92,10 @@ class TestRunStopsOnTasksComplete:
         assert "complete" in result.output.lower()
         assert result.exit_code == 0
 
-    def test_run_stops_when_tasks_completed_during_loop(self, tmp_path: Path) -> None:
+    def test_run_stops_when_tasks_completed_during_loop(
+        self, tmp_path: Path, prompt_file: Path
+    ) -> None:
         """The loop stops after an iteration if tasks become complete."""
-        prompt_file = tmp_path / "LOOP-PROMPT.md"
-        prompt_file.write_text("test prompt")
         tasks_file = tmp_path / "TODO.md"
         tasks_file.write_text("# Tasks\n\n## Todo\n\n- [ ] task1\n")
 
@@ -94,7 +107,7 @@ class TestRunStopsOnTasksComplete:
             # Mark task complete after first call
             if call_count == 1:
                 tasks_file.write_text("# Tasks\n\n## Done\n\n- [x] task1\n")
-            return MagicMock(returncode=0, stdout="", stderr="")
+            return SimpleNamespace(returncode=0, stdout="", stderr="")
 
         with patch("wiggum.agents.check_cli_available", return_value=True):
 
@@ -123,12 +136,12 @@ class TestRunStopsOnTasksComplete:
         assert "complete" in result.output.lower()
         assert result.exit_code == 0
 
-    def test_run_continues_while_tasks_remain(self, tmp_path: Path) -> None:
+    def test_run_continues_while_tasks_remain(
+        self, tmp_path: Path, prompt_file: Path
+    ) -> None:
         """The loop keeps running while there are unchecked tasks."""
-        prompt_file = tmp_path / "LOOP-PROMPT.md"
-        prompt_file.write_text("test prompt")
         tasks_file = tmp_path / "TODO.md"
-        tasks_file.write_text("# Tasks\n\n## Todo\n\n- [ ] task1\n- [ ] task2\n")
+        tasks_file.write_text(_TWO_OPEN_TASKS)
 
         call_count = 0
 
@@ -141,10 +154,8 @@ class TestRunStopsOnTasksComplete:
                     "# Tasks\n\n## Done\n\n- [x] task1\n\n## Todo\n\n- [ ] task2\n"
                 )
             elif call_count == 2:
-                tasks_file.write_text(
-                    "# Tasks\n\n## Done\n\n- [x] task1\n- [x] task2\n"
-                )
-            return MagicMock(returncode=0, stdout="", stderr="")
+                tasks_file.write_text(_TWO_DONE_TASKS)
+            return SimpleNamespace(returncode=0, stdout="", stderr="")
 
         with patch("wiggum.agents.check_cli_available", return_value=True):
 
@@ -176,10 +187,8 @@ class TestRunStopsOnTasksComplete:
 class TestRemovedStopConditionFlags:
     """Tests that --stop-condition and --stop-file flags have been removed."""
 
-    def test_stop_condition_flag_not_accepted(self, tmp_path: Path) -> None:
+    def test_stop_condition_flag_not_accepted(self, prompt_file: Path) -> None:
         """--stop-condition flag should not be accepted."""
-        prompt_file = tmp_path / "LOOP-PROMPT.md"
-        prompt_file.write_text("test prompt")
 
         result = runner.invoke(
             app,
@@ -196,10 +205,8 @@ class TestRemovedStopConditionFlags:
         assert result.exit_code != 0
         assert "no such option" in result.output.lower()
 
-    def test_stop_file_flag_not_accepted(self, tmp_path: Path) -> None:
+    def test_stop_file_flag_not_accepted(self, prompt_file: Path) -> None:
         """--stop-file flag should not be accepted."""
-        prompt_file = tmp_path / "LOOP-PROMPT.md"
-        prompt_file.write_text("test prompt")
 
         result = runner.invoke(
             app,
@@ -220,10 +227,8 @@ class TestRemovedStopConditionFlags:
 class TestDryRunOutput:
     """Tests for dry-run mode output."""
 
-    def test_dry_run_shows_tasks_stop_condition(self, tmp_path: Path) -> None:
+    def test_dry_run_shows_tasks_stop_condition(self, prompt_file: Path) -> None:
         """Dry run output shows tasks-based stop condition."""
-        prompt_file = tmp_path / "LOOP-PROMPT.md"
-        prompt_file.write_text("test prompt")
 
         result = runner.invoke(
             app,
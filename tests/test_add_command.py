@@ -49,12 +49,10 @@ class TestAddCommand:
 
     def test_add_task_to_default_file(self, tmp_path: Path) -> None:
         """Uses TODO.md in current directory by default."""
-        tasks_file = tmp_path / "TODO.md"
-        tasks_file.write_text("# Tasks\n\n## Done\n\n## In Progress\n\n## Todo\n\n")
-
         with runner.isolated_filesystem(temp_dir=tmp_path):
-            # Copy file into isolated filesystem
-            Path("TODO.md").write_text(tasks_file.read_text())
+            Path("TODO.md").write_text(
+                "# Tasks\n\n## Done\n\n## In Progress\n\n## Todo\n\n"
+            )
             result = runner.invoke(app, ["add", "New task"])
             content = Path("TODO.md").read_text()
 
@@ -14,18 +14,10 @@ class TestCleanCommand:
 
     def test_clean_removes_config_files(self, tmp_path: Path) -> None:
         """Removes LOOP-PROMPT.md and .wiggum.toml by default."""
-        loop_prompt = tmp_path / "LOOP-PROMPT.md"
-        config = tmp_path / ".wiggum.toml"
-        tasks = tmp_path / "TODO.md"
-
-        loop_prompt.write_text("# Prompt\n")
-        config.write_text("[loop]\n")
-        tasks.write_text("# Tasks\n\n## Todo\n\n- [ ] Task\n")
-
         with runner.isolated_filesystem(temp_dir=tmp_path):
-            Path("LOOP-PROMPT.md").write_text(loop_prompt.read_text())
-            Path(".wiggum.toml").write_text(config.read_text())
-            Path("TODO.md").write_text(tasks.read_text())
+            Path("LOOP-PROMPT.md").write_text("# Prompt\n")
+            Path(".wiggum.toml").write_text("[loop]\n")
+            Path("TODO.md").write_text("# Tasks\n\n## Todo\n\n- [ ] Task\n")
 
             result = runner.invoke(app, ["clean", "--force", "--keep-tasks"])
 
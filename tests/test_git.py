@@ -1,6 +1,7 @@
 """Tests for the wiggum git module."""
 
 import subprocess
+from collections.abc import Callable
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -8,125 +9,264 @@ import pytest
 
 from wiggum.git import (
     GitError,
+    clear_cache,
     create_branch,
     create_pr,
     fetch_and_merge_main,
     get_current_branch,
     get_main_branch_name,
+    get_repo_info,
+    has_remote,
     is_git_repo,
     push_branch,
 )
 
 
+# Setup-only git calls: output is never inspected, so don't pipe it
+_QUIET = {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL, "check": True}
+
+
+def _fake_git(
+    responses: dict[tuple[str, ...], tuple[int, str]],
+) -> Callable[..., MagicMock]:
+    """Build a subprocess.run side effect that answers git commands by prefix.
+
+    Args:
+        responses: Maps a git argument prefix (without 'git') to the
+            (returncode, stdout) it should produce. Unmatched commands
+            succeed with empty output.
+    """
+
+    def run(cmd: list[str], **kwargs: object) -> MagicMock:
+        args = tuple(cmd[1:])
+        for prefix, (returncode, stdout) in responses.items():
+            if args[: len(prefix)] == prefix:
+                return MagicMock(returncode=returncode, stdout=stdout, stderr="")
+        return MagicMock(returncode=0, stdout="", stderr="")
+
+    return run
+
+
 class TestIsGitRepo:
     """Tests for is_git_repo function."""
 
+    @pytest.mark.integration
     def test_returns_true_in_git_repo(self, tmp_path: Path) -> None:
         """Returns True when in a git repository."""
         # Initialize a git repo
-        subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+        subprocess.run(["git", "init"], cwd=tmp_path, **_QUIET)
         assert is_git_repo(tmp_path) is True
 
+    @patch("wiggum.git.subprocess.run")
+    def test_returns_true_when_git_dir_found(
+        self, mock_run: MagicMock, tmp_path: Path
+    ) -> None:
+        """Returns True when git can locate a repository."""
+        mock_run.return_value = MagicMock(returncode=0, stdout=".git\n", stderr="")
+
+        assert is_git_repo(tmp_path) is True
+        assert mock_run.call_args[0][0] == ["git", "rev-parse", "--git-dir"]
+
+    @pytest.mark.integration
+    def test_detects_repo_from_subdirectory(self, git_repo: Path) -> None:
+        """Finds the repository from a nested directory."""
+        subdir = git_repo / "src" / "pkg"
+        subdir.mkdir(parents=True)
+
+        assert is_git_repo(subdir) is True
+
+    @pytest.mark.integration
+    def test_detects_bare_repo(self, tmp_path: Path) -> None:
+        """Detects bare repositories, which have no .git entry."""
+        subprocess.run(["git", "init", "--bare"], cwd=tmp_path, **_QUIET)
+
+        assert is_git_repo(tmp_path) is True
+
+    @pytest.mark.integration
     def test_returns_false_outside_git_repo(self, tmp_path: Path) -> None:
         """Returns False when not in a git repository."""
         assert is_git_repo(tmp_path) is False
 
+    @pytest.mark.integration
+    def test_respects_git_ceiling_directories(
+        self, git_repo: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Stops at GIT_CEILING_DIRECTORIES the way git does."""
+        subdir = git_repo / "sub"
+        subdir.mkdir()
+        monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(git_repo))
+
+        assert is_git_repo(subdir) is False
+
+
+class TestRepoMetadataCache:
+    """Tests for per-directory caching of repository metadata."""
+
+    @patch("wiggum.git.subprocess.run")
+    def test_repeated_calls_run_git_once(
+        self, mock_run: MagicMock, tmp_path: Path
+    ) -> None:
+        """Repeated lookups for the same directory reuse the first result."""
+        mock_run.return_value = MagicMock(
+            returncode=0, stdout="origin/main\n", stderr=""
+        )
+
+        assert has_remote(tmp_path) is True
+        assert has_remote(tmp_path) is True
+        assert get_main_branch_name(tmp_path) == "main"
+        assert get_main_branch_name(tmp_path) == "main"
+
+        assert mock_run.call_count == 2
+
+    @pytest.mark.integration
+    def test_clear_cache_forces_fresh_lookup(self, tmp_path: Path) -> None:
+        """clear_cache discards cached results."""
+        assert is_git_repo(tmp_path) is False
+
+        subprocess.run(["git", "init"], cwd=tmp_path, **_QUIET)
+        assert is_git_repo(tmp_path) is False  # Still the cached answer
+        clear_cache()
+
+        assert is_git_repo(tmp_path) is True
+
+
+class TestGetRepoInfo:
+    """Tests for get_repo_info function."""
+
+    @pytest.mark.integration
+    def test_reports_current_branch(self, git_repo: Path) -> None:
+        """Reports the checked-out branch of a real repository."""
+        subprocess.run(["git", "checkout", "-b", "wiggum/test"], cwd=git_repo, **_QUIET)
+
+        info = get_repo_info(git_repo)
+
+        assert info.is_repo is True
+        assert info.current_branch == "wiggum/test"
+
+    @patch("wiggum.git.subprocess.run")
+    def test_parses_branch_listing_in_one_call(
+        self, mock_run: MagicMock, tmp_path: Path
+    ) -> None:
+        """Reads the current branch from a single for-each-ref listing."""
+        mock_run.return_value = MagicMock(
+            returncode=0, stdout="  main\n* wiggum/test\n", stderr=""
+        )
+
+        info = get_repo_info(tmp_path)
+
+        assert info.is_repo is True
+        assert info.current_branch == "wiggum/test"
+        assert mock_run.call_count == 1
+
+    @patch("wiggum.git.subprocess.run")
+    def test_outside_git_repo(self, mock_run: MagicMock, tmp_path: Path) -> None:
+        """Reports is_repo=False outside a git repository."""
+        mock_run.return_value = MagicMock(returncode=128, stdout="", stderr="")
+
+        info = get_repo_info(tmp_path)
+
+        assert info.is_repo is False
+        assert info.current_branch is None
+
 
 class TestGetMainBranchName:
     """Tests for get_main_branch_name function."""
 
-    def test_detects_main_branch(self, tmp_path: Path) -> None:
+    @patch("wiggum.git.subprocess.run")
+    def test_detects_main_branch(self, mock_run: MagicMock, tmp_path: Path) -> None:
         """Detects 'main' as the main branch."""
-        subprocess.run(["git", "init", "-b", "main"], cwd=tmp_path, capture_output=True)
-        subprocess.run(
-            ["git", "config", "user.email", "test@test.com"],
-            cwd=tmp_path,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "config", "user.name", "Test"],
-            cwd=tmp_path,
-            capture_output=True,
-        )
-        (tmp_path / "file.txt").write_text("content")
-        subprocess.run(["git", "add", "."], cwd=tmp_path, capture_output=True)
-        subprocess.run(
-            ["git", "commit", "-m", "init"], cwd=tmp_path, capture_output=True
+        mock_run.side_effect = _fake_git(
+            {
+                ("symbolic-ref",): (128, ""),
+                ("for-each-ref",): (0, "main\nmaster\n"),
+            }
         )
 
         assert get_main_branch_name(tmp_path) == "main"
 
-    def test_detects_master_branch(self, tmp_path: Path) -> None:
+    @patch("wiggum.git.subprocess.run")
+    def test_detects_master_branch(self, mock_run: MagicMock, tmp_path: Path) -> None:
         """Detects 'master' as the main branch when 'main' doesn't exist."""
-        subprocess.run(
-            ["git", "init", "-b", "master"], cwd=tmp_path, capture_output=True
-        )
-        subprocess.run(
-            ["git", "config", "user.email", "test@test.com"],
-            cwd=tmp_path,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "config", "user.name", "Test"],
-            cwd=tmp_path,
-            capture_output=True,
-        )
-        (tmp_path / "file.txt").write_text("content")
-        subprocess.run(["git", "add", "."], cwd=tmp_path, capture_output=True)
-        subprocess.run(
-            ["git", "commit", "-m", "init"], cwd=tmp_path, capture_output=True
+        mock_run.side_effect = _fake_git(
+            {
+                ("symbolic-ref",): (128, ""),
+                ("for-each-ref",): (0, "master\n"),
+            }
         )
 
         assert get_main_branch_name(tmp_path) == "master"
 
-    def test_raises_when_no_main_or_master(self, tmp_path: Path) -> None:
+    @patch("wiggum.git.subprocess.run")
+    def test_raises_when_no_main_or_master(
+        self, mock_run: MagicMock, tmp_path: Path
+    ) -> None:
         """Raises GitError when neither 'main' nor 'master' exists."""
-        subprocess.run(
-            ["git", "init", "-b", "develop"], cwd=tmp_path, capture_output=True
-        )
-        subprocess.run(
-            ["git", "config", "user.email", "test@test.com"],
-            cwd=tmp_path,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "config", "user.name", "Test"],
-            cwd=tmp_path,
-            capture_output=True,
-        )
-        (tmp_path / "file.txt").write_text("content")
-        subprocess.run(["git", "add", "."], cwd=tmp_path, capture_output=True)
-        subprocess.run(
-            ["git", "commit", "-m", "init"], cwd=tmp_path, capture_output=True
+        mock_run.side_effect = _fake_git(
+            {
+                ("symbolic-ref",): (128, ""),
+                ("for-each-ref",): (0, ""),
+            }
         )
 
         with pytest.raises(GitError, match="Could not detect main branch"):
             get_main_branch_name(tmp_path)
 
+    @patch("wiggum.git.subprocess.run")
+    def test_prefers_remote_default_branch(
+        self, mock_run: MagicMock, tmp_path: Path
+    ) -> None:
+        """Uses origin/HEAD when the remote's default branch is known."""
+        mock_run.side_effect = _fake_git({("symbolic-ref",): (0, "origin/trunk\n")})
+
+        assert get_main_branch_name(tmp_path) == "trunk"
+        assert mock_run.call_count == 1
+
+    @pytest.mark.integration
+    def test_detects_branch_in_real_repo(self, git_repo: Path) -> None:
+        """Detects the main branch of a real repository."""
+        assert get_main_branch_name(git_repo) == "main"
+
+    @pytest.mark.integration
+    def test_reads_remote_default_branch_from_clone(
+        self, git_repo: Path, tmp_path_factory: pytest.TempPathFactory
+    ) -> None:
+        """Reads origin/HEAD from a real clone whose remote uses 'trunk'."""
+        subprocess.run(["git", "branch", "-m", "trunk"], cwd=git_repo, **_QUIET)
+        clone = tmp_path_factory.mktemp("clone")
+        subprocess.run(["git", "clone", str(git_repo), str(clone)], **_QUIET)
+
+        assert get_main_branch_name(clone) == "trunk"
+
+    @pytest.mark.integration
+    def test_prefers_remote_default_over_local_main(
+        self, git_repo: Path, tmp_path_factory: pytest.TempPathFactory
+    ) -> None:
+        """Picks origin/HEAD even when a local 'main' branch also exists."""
+        subprocess.run(["git", "branch", "-m", "develop"], cwd=git_repo, **_QUIET)
+        clone = tmp_path_factory.mktemp("clone")
+        subprocess.run(["git", "clone", str(git_repo), str(clone)], **_QUIET)
+        subprocess.run(["git", "branch", "main"], cwd=clone, **_QUIET)
+
+        assert get_main_branch_name(clone) == "develop"
+
 
 class TestGetCurrentBranch:
     """Tests for get_current_branch function."""
 
-    def test_returns_current_branch_name(self, tmp_path: Path) -> None:
+    @pytest.mark.integration
+    def test_returns_current_branch_name(self, git_repo: Path) -> None:
         """Returns the name of the current branch."""
-        subprocess.run(["git", "init", "-b", "main"], cwd=tmp_path, capture_output=True)
-        subprocess.run(
-            ["git", "config", "user.email", "test@test.com"],
-            cwd=tmp_path,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "config", "user.name", "Test"],
-            cwd=tmp_path,
-            capture_output=True,
-        )
-        (tmp_path / "file.txt").write_text("content")
-        subprocess.run(["git", "add", "."], cwd=tmp_path, capture_output=True)
-        subprocess.run(
-            ["git", "commit", "-m", "init"], cwd=tmp_path, capture_output=True
+        assert get_current_branch(git_repo) == "main"
+
+    @patch("wiggum.git.subprocess.run")
+    def test_strips_branch_name(self, mock_run: MagicMock, tmp_path: Path) -> None:
+        """Returns the branch reported by git without its trailing newline."""
+        mock_run.return_value = MagicMock(
+            returncode=0, stdout="feature-branch\n", stderr=""
         )
 
-        assert get_current_branch(tmp_path) == "main"
+        assert get_current_branch(tmp_path) == "feature-branch"
+        assert mock_run.call_args[0][0] == ["git", "rev-parse", "--abbrev-ref", "HEAD"]
 
     @patch("wiggum.git.subprocess.run")
     def test_raises_on_timeout(self, mock_run: MagicMock, tmp_path: Path) -> None:
@@ -140,109 +280,102 @@ class TestGetCurrentBranch:
 class TestCreateBranch:
     """Tests for create_branch function."""
 
-    def test_creates_and_switches_to_new_branch(self, tmp_path: Path) -> None:
+    @pytest.mark.integration
+    def test_creates_and_switches_to_new_branch(self, git_repo: Path) -> None:
         """Creates a new branch and switches to it."""
-        subprocess.run(["git", "init", "-b", "main"], cwd=tmp_path, capture_output=True)
-        subprocess.run(
-            ["git", "config", "user.email", "test@test.com"],
-            cwd=tmp_path,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "config", "user.name", "Test"],
-            cwd=tmp_path,
-            capture_output=True,
-        )
-        (tmp_path / "file.txt").write_text("content")
-        subprocess.run(["git", "add", "."], cwd=tmp_path, capture_output=True)
-        subprocess.run(
-            ["git", "commit", "-m", "init"], cwd=tmp_path, capture_output=True
-        )
+        create_branch("feature-branch", git_repo)
+
+        assert get_current_branch(git_repo) == "feature-branch"
+
+    @patch("wiggum.git.subprocess.run")
+    def test_checks_out_new_branch(self, mock_run: MagicMock, tmp_path: Path) -> None:
+        """Runs checkout -b when the branch doesn't exist yet."""
+        mock_run.side_effect = _fake_git({("rev-parse", "--verify"): (128, "")})
 
         create_branch("feature-branch", tmp_path)
 
-        assert get_current_branch(tmp_path) == "feature-branch"
+        assert mock_run.call_args[0][0] == [
+            "git",
+            "checkout",
+            "-b",
+            "feature-branch",
+        ]
 
-    def test_raises_when_branch_already_exists(self, tmp_path: Path) -> None:
+    @patch("wiggum.git.subprocess.run")
+    def test_raises_when_branch_already_exists(
+        self, mock_run: MagicMock, tmp_path: Path
+    ) -> None:
         """Raises GitError when trying to create existing branch."""
-        subprocess.run(["git", "init", "-b", "main"], cwd=tmp_path, capture_output=True)
-        subprocess.run(
-            ["git", "config", "user.email", "test@test.com"],
-            cwd=tmp_path,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "config", "user.name", "Test"],
-            cwd=tmp_path,
-            capture_output=True,
-        )
-        (tmp_path / "file.txt").write_text("content")
-        subprocess.run(["git", "add", "."], cwd=tmp_path, capture_output=True)
-        subprocess.run(
-            ["git", "commit", "-m", "init"], cwd=tmp_path, capture_output=True
-        )
+        mock_run.side_effect = _fake_git({("rev-parse", "--verify"): (0, "abc123\n")})
 
         with pytest.raises(GitError, match="already exists"):
             create_branch("main", tmp_path)
+        assert mock_run.call_count == 1
 
 
 class TestFetchAndMergeMain:
     """Tests for fetch_and_merge_main function."""
 
-    def test_skips_when_no_remote(self, tmp_path: Path) -> None:
+    @patch("wiggum.git.subprocess.run")
+    def test_skips_when_no_remote(self, mock_run: MagicMock, tmp_path: Path) -> None:
         """Returns early when there is no remote configured."""
-        subprocess.run(["git", "init", "-b", "main"], cwd=tmp_path, capture_output=True)
-        subprocess.run(
-            ["git", "config", "user.email", "test@test.com"],
-            cwd=tmp_path,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "config", "user.name", "Test"],
-            cwd=tmp_path,
-            capture_output=True,
-        )
-        (tmp_path / "file.txt").write_text("content")
-        subprocess.run(["git", "add", "."], cwd=tmp_path, capture_output=True)
-        subprocess.run(
-            ["git", "commit", "-m", "init"], cwd=tmp_path, capture_output=True
-        )
+        mock_run.side_effect = _fake_git({("remote",): (0, "")})
 
         # Should not raise - just skips silently
         result = fetch_and_merge_main(tmp_path)
         assert result is False  # Indicates no fetch/merge happened
+        assert mock_run.call_count == 1
+
+    @pytest.mark.integration
+    def test_skips_without_remote_in_real_repo(self, git_repo: Path) -> None:
+        """Skips fetch/merge in a real repository that has no remote."""
+        assert fetch_and_merge_main(git_repo) is False
 
 
 class TestPushBranch:
     """Tests for push_branch function."""
 
-    def test_raises_when_no_remote(self, tmp_path: Path) -> None:
+    @patch("wiggum.git.subprocess.run")
+    def test_raises_when_no_remote(self, mock_run: MagicMock, tmp_path: Path) -> None:
         """Raises GitError when there is no remote configured."""
-        subprocess.run(["git", "init", "-b", "main"], cwd=tmp_path, capture_output=True)
-        subprocess.run(
-            ["git", "config", "user.email", "test@test.com"],
-            cwd=tmp_path,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "config", "user.name", "Test"],
-            cwd=tmp_path,
-            capture_output=True,
-        )
-        (tmp_path / "file.txt").write_text("content")
-        subprocess.run(["git", "add", "."], cwd=tmp_path, capture_output=True)
-        subprocess.run(
-            ["git", "commit", "-m", "init"], cwd=tmp_path, capture_output=True
-        )
+        mock_run.side_effect = _fake_git({("remote",): (0, "")})
 
         with pytest.raises(GitError, match="No remote"):
             push_branch(tmp_path)
 
+    @patch("wiggum.git.subprocess.run")
+    def test_pushes_current_branch_with_upstream(
+        self, mock_run: MagicMock, tmp_path: Path
+    ) -> None:
+        """Pushes the current branch to origin and sets upstream."""
+        mock_run.side_effect = _fake_git(
+            {
+                ("remote",): (0, "origin\n"),
+                ("rev-parse", "--abbrev-ref"): (0, "wiggum/test\n"),
+            }
+        )
+
+        push_branch(tmp_path)
+
+        assert mock_run.call_args[0][0] == [
+            "git",
+            "push",
+            "-u",
+            "origin",
+            "wiggum/test",
+        ]
+
+    @pytest.mark.integration
+    def test_raises_without_remote_in_real_repo(self, git_repo: Path) -> None:
+        """Raises GitError in a real repository that has no remote."""
+        with pytest.raises(GitError, match="No remote"):
+            push_branch(git_repo)
+
 
 class TestCreatePr:
     """Tests for create_pr function."""
 
-    @patch("subprocess.run")
+    @patch("wiggum.git.subprocess.run")
     def test_calls_gh_pr_create(self, mock_run: MagicMock, tmp_path: Path) -> None:
         """Calls gh pr create with correct arguments."""
         mock_run.return_value = MagicMock(
@@ -263,7 +396,7 @@ class TestCreatePr:
         assert call_args[0][0][1] == "pr"
         assert call_args[0][0][2] == "create"
 
-    @patch("subprocess.run")
+    @patch("wiggum.git.subprocess.run")
     def test_raises_on_gh_failure(self, mock_run: MagicMock, tmp_path: Path) -> None:
         """Raises GitError when gh command fails."""
         mock_run.return_value = MagicMock(
@@ -273,7 +406,7 @@ class TestCreatePr:
         with pytest.raises(GitError, match="Failed to create PR"):
             create_pr(title="Test PR", body="Test body", base="main", cwd=tmp_path)
 
-    @patch("subprocess.run")
+    @patch("wiggum.git.subprocess.run")
     def test_raises_on_timeout(self, mock_run: MagicMock, tmp_path: Path) -> None:
         """Raises GitError when gh command times out."""
         mock_run.side_effect = subprocess.TimeoutExpired(cmd="gh", timeout=120)
@@ -1,116 +1,163 @@
 """Tests for the git safety features in the run command."""
 
+import subprocess
+from collections.abc import Iterator
 from pathlib import Path
 from unittest.mock import patch
 
+import pytest
 from typer.testing import CliRunner
 
-from wiggum.cli import app
+from wiggum.cli import _format_dry_run, app
+from wiggum.config import ResolvedRunConfig, resolve_run_config
 
 runner = CliRunner()
 
+# Setup-only git calls: output is never inspected, so don't pipe it
+_QUIET = {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL, "check": True}
+
+
+def _dry_run_config(**flags: object) -> ResolvedRunConfig:
+    """Resolve a run config as the run command would, from CLI flag values.
+
+    Must run inside cli_fs so no stray config file is picked up.
+    """
+    args: dict[str, object] = {
+        "yolo": None,
+        "allow_paths": None,
+        "max_iterations": None,
+        "tasks_file": None,
+        "prompt_file": None,
+        "agent": None,
+        "show_progress": False,
+        "continue_session": False,
+        "reset_session": False,
+        "keep_running": False,
+        "stop_when_done": False,
+    }
+    args.update(flags)
+    return resolve_run_config(**args)
+
+
+@pytest.fixture
+def cli_fs(tmp_path: Path) -> Iterator[Path]:
+    """Run the test inside an isolated filesystem with a prompt and one task."""
+    with runner.isolated_filesystem(temp_dir=tmp_path) as fs:
+        Path("LOOP-PROMPT.md").write_text("Test prompt")
+        Path("TODO.md").write_text("# Tasks\n\n## Todo\n\n- [ ] Test task\n")
+        yield Path(fs)
+
 
 class TestGitSafetyDryRun:
     """Tests for git safety dry run output."""
 
-    def test_dry_run_shows_git_safety_enabled_by_default(self, tmp_path: Path) -> None:
-        """Shows git safety is enabled by default."""
-        with runner.isolated_filesystem(temp_dir=tmp_path):
-            Path("LOOP-PROMPT.md").write_text("Test prompt")
-            Path("TODO.md").write_text("# Tasks\n\n## Todo\n\n- [ ] Test task\n")
-            result = runner.invoke(app, ["run", "--dry-run"])
+    def test_dry_run_default_git_safety_output(self, cli_fs: Path) -> None:
+        """Git safety is enabled with the 'wiggum' branch prefix by default."""
+        result = runner.invoke(app, ["run", "--dry-run"])
 
         assert result.exit_code == 0
         assert "Git safety: enabled" in result.output
+        assert "Branch prefix: wiggum" in result.output
 
-    def test_dry_run_shows_git_safety_disabled_with_no_branch(
-        self, tmp_path: Path
+    @pytest.mark.parametrize(
+        ("flags", "expected"),
+        [
+            pytest.param(
+                ["--no-branch"], "Git safety: disabled (--no-branch)", id="no-branch"
+            ),
+            pytest.param(["--force"], "Git safety: disabled (--force)", id="force"),
+            pytest.param(
+                ["--pr"], "PR creation: enabled (will create PR after loop)", id="pr"
+            ),
+            pytest.param(
+                ["--branch-prefix", "myprefix"],
+                "Branch prefix: myprefix",
+                id="branch-prefix",
+            ),
+        ],
+    )
+    def test_dry_run_reflects_git_flags(
+        self, cli_fs: Path, flags: list[str], expected: str
     ) -> None:
-        """Shows git safety disabled when --no-branch is used."""
-        with runner.isolated_filesystem(temp_dir=tmp_path):
-            Path("LOOP-PROMPT.md").write_text("Test prompt")
-            Path("TODO.md").write_text("# Tasks\n\n## Todo\n\n- [ ] Test task\n")
-            result = runner.invoke(app, ["run", "--dry-run", "--no-branch"])
+        """Each git option reaches the dry-run report through the CLI."""
+        result = runner.invoke(app, ["run", "--dry-run", *flags])
 
         assert result.exit_code == 0
-        assert "Git safety: disabled (--no-branch)" in result.output
+        assert expected in result.output
 
-    def test_dry_run_shows_git_safety_disabled_with_force(self, tmp_path: Path) -> None:
-        """Shows git safety disabled when --force is used."""
-        with runner.isolated_filesystem(temp_dir=tmp_path):
-            Path("LOOP-PROMPT.md").write_text("Test prompt")
-            Path("TODO.md").write_text("# Tasks\n\n## Todo\n\n- [ ] Test task\n")
-            result = runner.invoke(app, ["run", "--dry-run", "--force"])
+    def test_dry_run_shows_agent_specific_command_for_codex(self, cli_fs: Path) -> None:
+        """Dry-run should show codex command when --agent codex is selected."""
+        result = runner.invoke(app, ["run", "--dry-run", "--agent", "codex"])
 
         assert result.exit_code == 0
-        assert "Git safety: disabled (--force)" in result.output
+        assert "Command: codex --yolo --json <prompt>" in result.output
 
-    def test_dry_run_shows_pr_creation_when_enabled(self, tmp_path: Path) -> None:
-        """Shows PR creation when --pr flag is used."""
-        with runner.isolated_filesystem(temp_dir=tmp_path):
-            Path("LOOP-PROMPT.md").write_text("Test prompt")
-            Path("TODO.md").write_text("# Tasks\n\n## Todo\n\n- [ ] Test task\n")
-            result = runner.invoke(app, ["run", "--dry-run", "--pr"])
 
-        assert result.exit_code == 0
-        assert "PR creation: enabled" in result.output
+class TestFormatDryRun:
+    """Tests for the dry-run report built by _format_dry_run."""
+
+    @pytest.mark.parametrize(
+        ("overrides", "expected"),
+        [
+            pytest.param(
+                {"no_branch": True},
+                "Git safety: disabled (--no-branch)",
+                id="no-branch",
+            ),
+            pytest.param({"force": True}, "Git safety: disabled (--force)", id="force"),
+            pytest.param(
+                {"no_branch": True, "force": True},
+                "Git safety: disabled (--no-branch)",
+                id="no-branch-wins-over-force",
+            ),
+            pytest.param(
+                {"create_pr": True},
+                "PR creation: enabled (will create PR after loop)",
+                id="pr",
+            ),
+            pytest.param(
+                {"branch_prefix": "myprefix"},
+                "Branch prefix: myprefix",
+                id="branch-prefix",
+            ),
+        ],
+    )
+    def test_reports_git_settings(
+        self, cli_fs: Path, overrides: dict[str, object], expected: str
+    ) -> None:
+        """Reports git safety, PR creation and branch prefix settings."""
+        report = _format_dry_run(_dry_run_config(**overrides), "claude", "Test prompt")
 
-    def test_dry_run_shows_branch_prefix(self, tmp_path: Path) -> None:
-        """Shows branch prefix in dry run."""
-        with runner.isolated_filesystem(temp_dir=tmp_path):
-            Path("LOOP-PROMPT.md").write_text("Test prompt")
-            Path("TODO.md").write_text("# Tasks\n\n## Todo\n\n- [ ] Test task\n")
-            result = runner.invoke(
-                app, ["run", "--dry-run", "--branch-prefix", "myprefix"]
-            )
+        assert expected in report.splitlines()
 
-        assert result.exit_code == 0
-        assert "Branch prefix: myprefix" in result.output
+    def test_omits_pr_line_when_disabled(self, cli_fs: Path) -> None:
+        """Doesn't mention PR creation unless it is enabled."""
+        report = _format_dry_run(_dry_run_config(), "claude", "Test prompt")
 
-    def test_dry_run_default_branch_prefix(self, tmp_path: Path) -> None:
-        """Uses 'wiggum' as default branch prefix."""
-        with runner.isolated_filesystem(temp_dir=tmp_path):
-            Path("LOOP-PROMPT.md").write_text("Test prompt")
-            Path("TODO.md").write_text("# Tasks\n\n## Todo\n\n- [ ] Test task\n")
-            result = runner.invoke(app, ["run", "--dry-run"])
+        assert "PR creation" not in report
 
-        assert result.exit_code == 0
-        assert "Branch prefix: wiggum" in result.output
+    def test_ends_with_prompt(self, cli_fs: Path) -> None:
+        """Shows the prompt last, between separator lines."""
+        report = _format_dry_run(_dry_run_config(), "claude", "Test prompt")
 
-    def test_dry_run_shows_agent_specific_command_for_codex(
-        self, tmp_path: Path
-    ) -> None:
-        """Dry-run should show codex command when --agent codex is selected."""
-        with runner.isolated_filesystem(temp_dir=tmp_path):
-            Path("LOOP-PROMPT.md").write_text("Test prompt")
-            Path("TASKS.md").write_text("# Tasks\n\n## Todo\n\n- [ ] Test task\n")
-            result = runner.invoke(app, ["run", "--dry-run", "--agent", "codex"])
-
-        assert result.exit_code == 0
-        assert "Command: codex --yolo --json <prompt>" in result.output
+        assert report.endswith("Prompt:\n---\nTest prompt\n---")
 
 
 class TestGitSafetyConfig:
     """Tests for git safety configuration resolution."""
 
-    def test_pr_from_config(self, tmp_path: Path) -> None:
+    def test_pr_from_config(self, cli_fs: Path) -> None:
         """Reads auto_pr setting from config file."""
-        with runner.isolated_filesystem(temp_dir=tmp_path):
-            Path(".wiggum.toml").write_text("[git]\nauto_pr = true")
-            Path("LOOP-PROMPT.md").write_text("Test prompt")
-            Path("TODO.md").write_text("# Tasks\n\n## Todo\n\n- [ ] Test task\n")
-            result = runner.invoke(app, ["run", "--dry-run"])
+        Path(".wiggum.toml").write_text("[git]\nauto_pr = true")
+        result = runner.invoke(app, ["run", "--dry-run"])
 
         assert result.exit_code == 0
         assert "PR creation: enabled" in result.output
 
-    def test_branch_prefix_from_config(self, tmp_path: Path) -> None:
+    def test_branch_prefix_from_config(self, cli_fs: Path) -> None:
         """Reads branch_prefix from config file."""
-        with runner.isolated_filesystem(temp_dir=tmp_path):
-            Path(".wiggum.toml").write_text('[git]\nbranch_prefix = "feature"')
-            Path("LOOP-PROMPT.md").write_text("Test prompt")
-            Path("TODO.md").write_text("# Tasks\n\n## Todo\n\n- [ ] Test task\n")
-            result = runner.invoke(app, ["run", "--dry-run"])
+        Path(".wiggum.toml").write_text('[git]\nbranch_prefix = "feature"')
+        result = runner.invoke(app, ["run", "--dry-run"])
 
         assert result.exit_code == 0
         assert "Branch prefix: feature" in result.output
@@ -119,31 +166,26 @@ class TestGitSafetyConfig:
 class TestGitSafetyNonGitRepo:
     """Tests for git safety behavior in non-git repositories."""
 
-    def test_non_git_repo_prompts_for_confirmation(self, tmp_path: Path) -> None:
+    def test_non_git_repo_prompts_for_confirmation(self, cli_fs: Path) -> None:
         """Non-git repo asks for confirmation to proceed."""
-        with runner.isolated_filesystem(temp_dir=tmp_path):
-            Path("LOOP-PROMPT.md").write_text("Test prompt")
-            Path("TODO.md").write_text("# Tasks\n\n## Todo\n\n- [ ] Test task\n")
-            # Answer 'n' to the confirmation prompt
-            with patch("wiggum.agents.check_cli_available", return_value=True):
-                result = runner.invoke(app, ["run", "-n", "1"], input="n\n")
+        # Answer 'n' to the confirmation prompt
+        with patch("wiggum.agents.check_cli_available", return_value=True):
+            result = runner.invoke(app, ["run", "-n", "1"], input="n\n")
 
         assert result.exit_code == 0
         assert "Not a git repository" in result.output
 
-    def test_non_git_repo_force_skips_prompt(self, tmp_path: Path) -> None:
+    def test_non_git_repo_force_skips_prompt(self, cli_fs: Path) -> None:
         """--force skips the confirmation prompt in non-git repos."""
-        with runner.isolated_filesystem(temp_dir=tmp_path):
-            Path("LOOP-PROMPT.md").write_text("Test prompt")
-            Path("TODO.md").write_text("# Tasks\n\n## Done\n\n- [x] Done\n")
-
-            with patch("wiggum.agents.check_cli_available", return_value=True):
-                with patch("wiggum.cli.get_agent") as mock_get_agent:
-                    mock_agent = mock_get_agent.return_value
-                    mock_agent.run.return_value.stdout = "output"
-                    mock_agent.run.return_value.stderr = ""
-                    mock_agent.run.return_value.return_code = 0
-                    result = runner.invoke(app, ["run", "-n", "1", "--force"])
+        Path("TODO.md").write_text("# Tasks\n\n## Done\n\n- [x] Done\n")
+
+        with patch("wiggum.agents.check_cli_available", return_value=True):
+            with patch("wiggum.cli.get_agent") as mock_get_agent:
+                mock_agent = mock_get_agent.return_value
+                mock_agent.run.return_value.stdout = "output"
+                mock_agent.run.return_value.stderr = ""
+                mock_agent.run.return_value.return_code = 0
+                result = runner.invoke(app, ["run", "-n", "1", "--force"])
 
         # Should not prompt, just run (and exit immediately since tasks are done)
         assert "Not a git repository" not in result.output
@@ -152,15 +194,45 @@ class TestGitSafetyNonGitRepo:
 class TestGitSafetyPrRequiresGitRepo:
     """Tests that --pr requires a git repository."""
 
-    def test_pr_requires_git_repo(self, tmp_path: Path) -> None:
+    def test_pr_requires_git_repo(self, cli_fs: Path) -> None:
         """--pr flag requires a git repository."""
-        with runner.isolated_filesystem(temp_dir=tmp_path):
-            Path("LOOP-PROMPT.md").write_text("Test prompt")
-            Path("TODO.md").write_text("# Tasks\n\n## Todo\n\n- [ ] Test task\n")
-
-            with patch("wiggum.agents.check_cli_available", return_value=True):
-                # Answer 'y' to proceed without git, but --pr should fail
-                result = runner.invoke(app, ["run", "-n", "1", "--pr"], input="y\n")
+        with patch("wiggum.agents.check_cli_available", return_value=True):
+            # Answer 'y' to proceed without git, but --pr should fail
+            result = runner.invoke(app, ["run", "-n", "1", "--pr"], input="y\n")
 
         assert result.exit_code == 1
         assert "--pr requires a git repository" in result.output
+
+
+class TestGitSafetyPrBaseBranch:
+    """Tests for the base branch of the PR created after the loop."""
+
+    @pytest.mark.integration
+    def test_pr_targets_remote_default_branch(
+        self,
+        git_repo: Path,
+        tmp_path_factory: pytest.TempPathFactory,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Opens the PR against origin/HEAD, even when a local 'main' exists."""
+        # The remote's default branch is 'develop'; the clone also has 'main'
+        subprocess.run(["git", "branch", "-m", "develop"], cwd=git_repo, **_QUIET)
+        clone = tmp_path_factory.mktemp("clone")
+        subprocess.run(["git", "clone", str(git_repo), str(clone)], **_QUIET)
+        subprocess.run(["git", "branch", "main"], cwd=clone, **_QUIET)
+        for var in ("AUTHOR", "COMMITTER"):
+            monkeypatch.setenv(f"GIT_{var}_NAME", "Test")
+            monkeypatch.setenv(f"GIT_{var}_EMAIL", "test@test.com")
+
+        monkeypatch.chdir(clone)
+        Path("LOOP-PROMPT.md").write_text("Test prompt")
+        Path("TODO.md").write_text("# Tasks\n\n## Done\n\n- [x] Done\n")
+        subprocess.run(["git", "add", "-A"], **_QUIET)
+        subprocess.run(["git", "commit", "-m", "Add loop files"], **_QUIET)
+
+        with patch("wiggum.agents.check_cli_available", return_value=True):
+            with patch("wiggum.git.create_pr", return_value="PR-URL") as mock_pr:
+                result = runner.invoke(app, ["run", "-n", "1", "--pr"])
+
+        assert result.exit_code == 0, result.output
+        assert mock_pr.call_args.kwargs["base"] == "develop"
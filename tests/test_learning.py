@@ -1,26 +1,105 @@
 """Tests for the learning diary feature."""
 
-import os
+from collections.abc import Callable
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from typing import Optional
+from unittest.mock import patch
 
 import pytest
 
+from wiggum.agents import AgentConfig, AgentResult
+from wiggum.config import resolve_run_config, write_config
 from wiggum.learning import (
     clear_diary,
     consolidate_learnings,
     ensure_diary_dir,
+    get_diary_line_count,
     has_diary_content,
     read_diary,
+    sanitize_for_prompt,
 )
 
-
-@pytest.fixture(autouse=True)
-def restore_cwd():
-    """Restore working directory after each test."""
-    original_cwd = os.getcwd()
-    yield
-    os.chdir(original_cwd)
+# Base arguments for resolve_run_config with every flag unset
+_BASE_CONFIG_ARGS = {
+    "yolo": False,
+    "allow_paths": None,
+    "max_iterations": None,
+    "tasks_file": None,
+    "prompt_file": None,
+    "agent": None,
+    "log_file": None,
+    "show_progress": False,
+    "continue_session": False,
+    "reset_session": False,
+    "keep_running": False,
+    "stop_when_done": False,
+    "create_pr": False,
+    "no_branch": False,
+    "force": False,
+    "branch_prefix": None,
+    "diary": False,
+    "no_diary": False,
+    "no_consolidate": False,
+    "keep_diary_flag": False,
+    "no_keep_diary": False,
+}
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "src" / "wiggum" / "templates"
+
+
+@pytest.fixture
+def make_diary(tmp_path: Path) -> Callable[[str], Path]:
+    """Return a factory that writes the session diary under tmp_path."""
+    diary_file = tmp_path / ".wiggum" / "session-diary.md"
+
+    def _make_diary(content: str) -> Path:
+        diary_file.parent.mkdir(exist_ok=True)
+        diary_file.write_text(content)
+        return diary_file
+
+    return _make_diary
+
+
+@pytest.fixture
+def unreadable_diary(
+    monkeypatch: pytest.MonkeyPatch, make_diary: Callable[[str], Path]
+) -> Path:
+    """Write a diary whose reads fail with PermissionError.
+
+    Patches Path.read_text rather than chmod-ing the file, since root (and
+    some containers) can read a file even with mode 000.
+    """
+    diary_file = make_diary("content")
+    real_read_text = Path.read_text
+
+    def _read_text(self: Path, *args: object, **kwargs: object) -> str:
+        if self == diary_file:
+            raise PermissionError(f"Permission denied: '{self}'")
+        return real_read_text(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "read_text", _read_text)
+    return diary_file
+
+
+class _FakeAgent:
+    """Agent stand-in that records each run's config and exits with return_code."""
+
+    def __init__(self, return_code: int = 0) -> None:
+        self.return_code = return_code
+        self.run_calls: list[AgentConfig] = []
+
+    def run(self, config: AgentConfig) -> AgentResult:
+        self.run_calls.append(config)
+        return AgentResult(stdout="", stderr="", return_code=self.return_code)
+
+
+@pytest.fixture
+def mocked_consolidation(monkeypatch: pytest.MonkeyPatch) -> _FakeAgent:
+    """Point consolidation at the bundled templates and a succeeding fake agent."""
+    agent = _FakeAgent()
+    monkeypatch.setattr("wiggum.learning.get_agent", lambda *args, **kwargs: agent)
+    monkeypatch.setattr("wiggum.learning.resolve_templates_dir", lambda: TEMPLATES_DIR)
+    return agent
 
 
 class TestEnsureDiaryDir:
@@ -58,41 +137,35 @@ class TestHasDiaryContent:
         """Returns False when diary file doesn't exist."""
         assert has_diary_content(base_path=tmp_path) is False
 
-    def test_returns_false_when_diary_is_empty(self, tmp_path: Path) -> None:
+    def test_returns_false_when_diary_is_empty(
+        self, tmp_path: Path, make_diary: Callable[[str], Path]
+    ) -> None:
         """Returns False when diary file is empty."""
-        (tmp_path / ".wiggum").mkdir()
-        (tmp_path / ".wiggum" / "session-diary.md").write_text("")
+        make_diary("")
 
         assert has_diary_content(base_path=tmp_path) is False
 
-    def test_returns_false_when_diary_is_whitespace_only(self, tmp_path: Path) -> None:
+    def test_returns_false_when_diary_is_whitespace_only(
+        self, tmp_path: Path, make_diary: Callable[[str], Path]
+    ) -> None:
         """Returns False when diary file contains only whitespace."""
-        (tmp_path / ".wiggum").mkdir()
-        (tmp_path / ".wiggum" / "session-diary.md").write_text("   \n\n  ")
+        make_diary("   \n\n  ")
 
         assert has_diary_content(base_path=tmp_path) is False
 
-    def test_returns_true_when_diary_has_content(self, tmp_path: Path) -> None:
+    def test_returns_true_when_diary_has_content(
+        self, tmp_path: Path, make_diary: Callable[[str], Path]
+    ) -> None:
         """Returns True when diary file has actual content."""
-        (tmp_path / ".wiggum").mkdir()
-        (tmp_path / ".wiggum" / "session-diary.md").write_text(
-            "### Learning: Test\n**Context**: Test context"
-        )
+        make_diary("### Learning: Test\n**Context**: Test context")
 
         assert has_diary_content(base_path=tmp_path) is True
 
-    def test_returns_false_on_read_error(self, tmp_path: Path) -> None:
+    def test_returns_false_on_read_error(
+        self, tmp_path: Path, unreadable_diary: Path
+    ) -> None:
         """Returns False when diary file cannot be read."""
-        (tmp_path / ".wiggum").mkdir()
-        diary_file = tmp_path / ".wiggum" / "session-diary.md"
-        diary_file.write_text("content")
-        # Make file unreadable
-        diary_file.chmod(0o000)
-        try:
-            assert has_diary_content(base_path=tmp_path) is False
-        finally:
-            # Restore permissions for cleanup
-            diary_file.chmod(0o644)
+        assert has_diary_content(base_path=tmp_path) is False
 
 
 class TestReadDiary:
@@ -102,36 +175,30 @@ class TestReadDiary:
         """Returns empty string when diary file doesn't exist."""
         assert read_diary(base_path=tmp_path) == ""
 
-    def test_returns_diary_content(self, tmp_path: Path) -> None:
+    def test_returns_diary_content(
+        self, tmp_path: Path, make_diary: Callable[[str], Path]
+    ) -> None:
         """Returns the content of the diary file."""
-        (tmp_path / ".wiggum").mkdir()
         content = "### Learning: Test\n**Context**: Test context"
-        (tmp_path / ".wiggum" / "session-diary.md").write_text(content)
+        make_diary(content)
 
         assert read_diary(base_path=tmp_path) == content
 
-    def test_returns_empty_string_on_read_error(self, tmp_path: Path) -> None:
+    def test_returns_empty_string_on_read_error(
+        self, tmp_path: Path, unreadable_diary: Path
+    ) -> None:
         """Returns empty string when diary file cannot be read."""
-        (tmp_path / ".wiggum").mkdir()
-        diary_file = tmp_path / ".wiggum" / "session-diary.md"
-        diary_file.write_text("content")
-        # Make file unreadable
-        diary_file.chmod(0o000)
-        try:
-            assert read_diary(base_path=tmp_path) == ""
-        finally:
-            # Restore permissions for cleanup
-            diary_file.chmod(0o644)
+        assert read_diary(base_path=tmp_path) == ""
 
 
 class TestClearDiary:
     """Tests for clear_diary function."""
 
-    def test_deletes_diary_file(self, tmp_path: Path) -> None:
+    def test_deletes_diary_file(
+        self, tmp_path: Path, make_diary: Callable[[str], Path]
+    ) -> None:
         """Deletes the diary file when it exists."""
-        (tmp_path / ".wiggum").mkdir()
-        diary_file = tmp_path / ".wiggum" / "session-diary.md"
-        diary_file.write_text("some content")
+        diary_file = make_diary("some content")
 
         clear_diary(base_path=tmp_path)
 
@@ -147,8 +214,6 @@ class TestSanitizeForPrompt:
 
     def test_wraps_content_with_delimiters(self) -> None:
         """Wraps content in labeled delimiters."""
-        from wiggum.learning import sanitize_for_prompt
-
         result = sanitize_for_prompt("some content", "test-label")
 
         assert "<test-label>" in result
@@ -158,8 +223,6 @@ class TestSanitizeForPrompt:
 
     def test_preserves_content_exactly(self) -> None:
         """Preserves content without modification."""
-        from wiggum.learning import sanitize_for_prompt
-
         content = "### Learning\n**Context**: Test\n```python\ncode```"
         result = sanitize_for_prompt(content, "label")
 
@@ -169,109 +232,73 @@ class TestSanitizeForPrompt:
 class TestConsolidateLearnings:
     """Tests for consolidate_learnings function."""
 
+    @pytest.fixture(autouse=True)
+    def _chdir_to_tmp_path(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Run from tmp_path, where consolidation looks for the diary and CLAUDE.md."""
+        monkeypatch.chdir(tmp_path)
+
     def test_returns_failure_with_reason_when_no_diary_content(
         self, tmp_path: Path
     ) -> None:
         """Returns (False, reason) when diary has no content."""
-        os.chdir(tmp_path)
-
         success, reason = consolidate_learnings(agent_name=None, yolo=True)
 
         assert success is False
         assert reason == "no diary content"
 
-    def test_calls_agent_with_correct_prompt(self, tmp_path: Path) -> None:
-        """Calls agent with diary content and CLAUDE.md content."""
-        os.chdir(tmp_path)
-        # Set up diary
-        (tmp_path / ".wiggum").mkdir()
+    def test_calls_agent_with_delimited_diary_and_claude_md(
+        self,
+        tmp_path: Path,
+        make_diary: Callable[[str], Path],
+        mocked_consolidation: _FakeAgent,
+    ) -> None:
+        """Sends diary and CLAUDE.md content, each wrapped in injection delimiters."""
         diary_content = "### Learning: Test\n**Context**: Test"
-        (tmp_path / ".wiggum" / "session-diary.md").write_text(diary_content)
-        # Set up CLAUDE.md
+        make_diary(diary_content)
         claude_md_content = "# Project\n\nExisting content"
         (tmp_path / "CLAUDE.md").write_text(claude_md_content)
 
-        mock_agent = MagicMock()
-        mock_agent.run.return_value = MagicMock(return_code=0)
-
-        with patch("wiggum.learning.get_agent", return_value=mock_agent):
-            with patch(
-                "wiggum.learning.resolve_templates_dir",
-                return_value=Path(__file__).parent.parent
-                / "src"
-                / "wiggum"
-                / "templates",
-            ):
-                success, reason = consolidate_learnings(agent_name="claude", yolo=True)
+        success, reason = consolidate_learnings(agent_name="claude", yolo=True)
 
         assert success is True
         assert reason is None
-        mock_agent.run.assert_called_once()
-        config = mock_agent.run.call_args[0][0]
-        assert diary_content in config.prompt
-        assert claude_md_content in config.prompt
+        assert len(mocked_consolidation.run_calls) == 1
+        config = mocked_consolidation.run_calls[0]
         assert config.yolo is True
-
-    def test_prompt_uses_delimiters_for_injection_protection(
-        self, tmp_path: Path
-    ) -> None:
-        """Prompt wraps content in delimiters to prevent prompt injection."""
-        os.chdir(tmp_path)
-        (tmp_path / ".wiggum").mkdir()
-        (tmp_path / ".wiggum" / "session-diary.md").write_text("diary content")
-        (tmp_path / "CLAUDE.md").write_text("claude content")
-
-        mock_agent = MagicMock()
-        mock_agent.run.return_value = MagicMock(return_code=0)
-
-        with patch("wiggum.learning.get_agent", return_value=mock_agent):
-            with patch(
-                "wiggum.learning.resolve_templates_dir",
-                return_value=Path(__file__).parent.parent
-                / "src"
-                / "wiggum"
-                / "templates",
-            ):
-                consolidate_learnings(agent_name="claude", yolo=True)
-
-        config = mock_agent.run.call_args[0][0]
-        # Should have delimiters around content
+        # Content appears only inside labeled delimiters
         assert "<diary-content>" in config.prompt
         assert "</diary-content>" in config.prompt
         assert "<claude-md-content>" in config.prompt
         assert "</claude-md-content>" in config.prompt
-        # Should have line delimiters
         assert "=" * 40 in config.prompt
+        assert sanitize_for_prompt(diary_content, "diary-content") in config.prompt
+        assert (
+            sanitize_for_prompt(claude_md_content, "claude-md-content") in config.prompt
+        )
 
-    def test_returns_failure_with_reason_on_agent_failure(self, tmp_path: Path) -> None:
+    def test_returns_failure_with_reason_on_agent_failure(
+        self,
+        tmp_path: Path,
+        make_diary: Callable[[str], Path],
+        mocked_consolidation: _FakeAgent,
+    ) -> None:
         """Returns (False, reason) when agent returns non-zero exit code."""
-        os.chdir(tmp_path)
-        (tmp_path / ".wiggum").mkdir()
-        (tmp_path / ".wiggum" / "session-diary.md").write_text("some content")
+        make_diary("some content")
 
-        mock_agent = MagicMock()
-        mock_agent.run.return_value = MagicMock(return_code=1)
+        mocked_consolidation.return_code = 1
 
-        with patch("wiggum.learning.get_agent", return_value=mock_agent):
-            with patch(
-                "wiggum.learning.resolve_templates_dir",
-                return_value=Path(__file__).parent.parent
-                / "src"
-                / "wiggum"
-                / "templates",
-            ):
-                success, reason = consolidate_learnings(agent_name="claude", yolo=True)
+        success, reason = consolidate_learnings(agent_name="claude", yolo=True)
 
         assert success is False
         assert reason == "agent failed with exit code 1"
 
     def test_returns_failure_with_reason_when_template_missing(
-        self, tmp_path: Path
+        self, tmp_path: Path, make_diary: Callable[[str], Path]
     ) -> None:
         """Returns (False, reason) when CONSOLIDATE-PROMPT.md template is missing."""
-        os.chdir(tmp_path)
-        (tmp_path / ".wiggum").mkdir()
-        (tmp_path / ".wiggum" / "session-diary.md").write_text("some content")
+        make_diary("some content")
 
         # Use a directory without the template
         empty_templates = tmp_path / "templates"
@@ -285,148 +312,101 @@ class TestConsolidateLearnings:
         assert success is False
         assert reason == "consolidation template not found"
 
-    def test_handles_missing_claude_md(self, tmp_path: Path) -> None:
+    def test_handles_missing_claude_md(
+        self,
+        tmp_path: Path,
+        make_diary: Callable[[str], Path],
+        mocked_consolidation: _FakeAgent,
+    ) -> None:
         """Works when CLAUDE.md doesn't exist."""
-        os.chdir(tmp_path)
-        (tmp_path / ".wiggum").mkdir()
-        (tmp_path / ".wiggum" / "session-diary.md").write_text("diary content")
-
-        mock_agent = MagicMock()
-        mock_agent.run.return_value = MagicMock(return_code=0)
+        make_diary("diary content")
 
-        with patch("wiggum.learning.get_agent", return_value=mock_agent):
-            with patch(
-                "wiggum.learning.resolve_templates_dir",
-                return_value=Path(__file__).parent.parent
-                / "src"
-                / "wiggum"
-                / "templates",
-            ):
-                success, reason = consolidate_learnings(agent_name="claude", yolo=True)
+        success, reason = consolidate_learnings(agent_name="claude", yolo=True)
 
         assert success is True
         assert reason is None
-        config = mock_agent.run.call_args[0][0]
+        config = mocked_consolidation.run_calls[0]
         assert "(No CLAUDE.md exists)" in config.prompt
 
 
 class TestLearningConfigResolution:
     """Tests for learning config resolution in resolve_run_config."""
 
-    def _base_config_args(self) -> dict:
-        """Return base arguments for resolve_run_config."""
-        return {
-            "yolo": False,
-            "allow_paths": None,
-            "max_iterations": None,
-            "tasks_file": None,
-            "prompt_file": None,
-            "agent": None,
-            "log_file": None,
-            "show_progress": False,
-            "continue_session": False,
-            "reset_session": False,
-            "keep_running": False,
-            "stop_when_done": False,
-            "create_pr": False,
-            "no_branch": False,
-            "force": False,
-            "branch_prefix": None,
-            "diary": False,
-            "no_diary": False,
-            "no_consolidate": False,
-            "keep_diary_flag": False,
-            "no_keep_diary": False,
-        }
-
-    def test_diary_and_no_diary_mutually_exclusive(self, tmp_path: Path) -> None:
-        """Cannot use --diary and --no-diary together."""
-        from wiggum.config import resolve_run_config
-
-        os.chdir(tmp_path)
-        args = self._base_config_args()
-        args["diary"] = True
-        args["no_diary"] = True
-
-        with pytest.raises(ValueError, match="mutually exclusive"):
-            resolve_run_config(**args)
-
-    def test_keep_diary_and_no_keep_diary_mutually_exclusive(
-        self, tmp_path: Path
+    @pytest.mark.parametrize(
+        "overrides",
+        [
+            pytest.param({"diary": True, "no_diary": True}, id="diary"),
+            pytest.param(
+                {"keep_diary_flag": True, "no_keep_diary": True}, id="keep-diary"
+            ),
+        ],
+    )
+    def test_conflicting_flags_are_mutually_exclusive(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, overrides: dict
     ) -> None:
-        """Cannot use --keep-diary and --no-keep-diary together."""
-        from wiggum.config import resolve_run_config
-
-        os.chdir(tmp_path)
-        args = self._base_config_args()
-        args["keep_diary_flag"] = True
-        args["no_keep_diary"] = True
+        """Cannot pass both the enabling and the disabling flag."""
+        monkeypatch.chdir(tmp_path)
 
         with pytest.raises(ValueError, match="mutually exclusive"):
-            resolve_run_config(**args)
-
-    def test_diary_flag_enables_learning(self, tmp_path: Path) -> None:
-        """--diary flag enables learning even when config disables it."""
-        from wiggum.config import resolve_run_config, write_config
-
-        os.chdir(tmp_path)
-        write_config({"learning": {"enabled": False}})
-        args = self._base_config_args()
-        args["diary"] = True
-
-        cfg = resolve_run_config(**args)
-
-        assert cfg.learning_enabled is True
-
-    def test_no_diary_flag_disables_learning(self, tmp_path: Path) -> None:
-        """--no-diary flag disables learning."""
-        from wiggum.config import resolve_run_config
-
-        os.chdir(tmp_path)
-        args = self._base_config_args()
-        args["no_diary"] = True
-
-        cfg = resolve_run_config(**args)
-
-        assert cfg.learning_enabled is False
-
-    def test_keep_diary_flag_overrides_config(self, tmp_path: Path) -> None:
-        """--keep-diary flag overrides config setting."""
-        from wiggum.config import resolve_run_config, write_config
-
-        os.chdir(tmp_path)
-        write_config({"learning": {"keep_diary": False}})
-        args = self._base_config_args()
-        args["keep_diary_flag"] = True
-
-        cfg = resolve_run_config(**args)
-
-        assert cfg.keep_diary is True
-
-    def test_no_keep_diary_flag_overrides_config(self, tmp_path: Path) -> None:
-        """--no-keep-diary flag overrides config setting."""
-        from wiggum.config import resolve_run_config
-
-        os.chdir(tmp_path)
-        args = self._base_config_args()
-        args["no_keep_diary"] = True
-
-        cfg = resolve_run_config(**args)
-
-        assert cfg.keep_diary is False
-
-    def test_learning_defaults_enabled(self, tmp_path: Path) -> None:
-        """Learning is enabled by default, but keep_diary is False."""
-        from wiggum.config import resolve_run_config
-
-        os.chdir(tmp_path)
-        args = self._base_config_args()
+            resolve_run_config(**{**_BASE_CONFIG_ARGS, **overrides})
+
+    @pytest.mark.parametrize(
+        ("config", "overrides", "expected"),
+        [
+            pytest.param(
+                {"learning": {"enabled": False}},
+                {"diary": True},
+                {"learning_enabled": True},
+                id="diary-flag-overrides-config",
+            ),
+            pytest.param(
+                None,
+                {"no_diary": True},
+                {"learning_enabled": False},
+                id="no-diary-flag-disables",
+            ),
+            pytest.param(
+                {"learning": {"keep_diary": False}},
+                {"keep_diary_flag": True},
+                {"keep_diary": True},
+                id="keep-diary-flag-overrides-config",
+            ),
+            pytest.param(
+                None,
+                {"no_keep_diary": True},
+                {"keep_diary": False},
+                id="no-keep-diary-flag",
+            ),
+            pytest.param(
+                None,
+                {},
+                # keep_diary defaults to False to reduce information leakage
+                {
+                    "learning_enabled": True,
+                    "keep_diary": False,
+                    "auto_consolidate": True,
+                },
+                id="defaults",
+            ),
+        ],
+    )
+    def test_resolves_learning_settings(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        config: Optional[dict],
+        overrides: dict,
+        expected: dict,
+    ) -> None:
+        """CLI flags override the config file, which overrides the defaults."""
+        monkeypatch.chdir(tmp_path)
+        if config is not None:
+            write_config(config)
 
-        cfg = resolve_run_config(**args)
+        cfg = resolve_run_config(**{**_BASE_CONFIG_ARGS, **overrides})
 
-        assert cfg.learning_enabled is True
-        assert cfg.keep_diary is False  # Default false to reduce information leakage
-        assert cfg.auto_consolidate is True
+        for attr, value in expected.items():
+            assert getattr(cfg, attr) is value, attr
 
 
 class TestGetDiaryLineCount:
@@ -434,15 +414,43 @@ class TestGetDiaryLineCount:
 
     def test_returns_zero_when_no_diary(self, tmp_path: Path) -> None:
         """Returns 0 when diary file doesn't exist."""
-        from wiggum.learning import get_diary_line_count
-
         assert get_diary_line_count(base_path=tmp_path) == 0
 
-    def test_returns_line_count(self, tmp_path: Path) -> None:
+    def test_returns_line_count(
+        self, tmp_path: Path, make_diary: Callable[[str], Path]
+    ) -> None:
         """Returns the number of lines in the diary."""
-        from wiggum.learning import get_diary_line_count
-
-        (tmp_path / ".wiggum").mkdir()
-        (tmp_path / ".wiggum" / "session-diary.md").write_text("line 1\nline 2\nline 3")
+        make_diary("line 1\nline 2\nline 3")
 
         assert get_diary_line_count(base_path=tmp_path) == 3
+
+    def test_trailing_newline_does_not_add_a_line(
+        self, tmp_path: Path, make_diary: Callable[[str], Path]
+    ) -> None:
+        """A trailing newline ends the last line rather than starting a new one."""
+        make_diary("line 1\nline 2\n")
+
+        assert get_diary_line_count(base_path=tmp_path) == 2
+
+    @pytest.mark.parametrize(
+        ("content", "expected"),
+        [
+            pytest.param(b"line 1\r\nline 2\r\n", 2, id="crlf"),
+            pytest.param(b"line 1\r\nline 2", 2, id="crlf-no-trailing-newline"),
+            pytest.param(b"line 1\rline 2\r", 1, id="lone-cr"),
+            pytest.param(
+                "line 1\u2028line 2\n".encode(), 1, id="unicode-line-separator"
+            ),
+        ],
+    )
+    def test_counts_lf_delimited_lines(
+        self,
+        tmp_path: Path,
+        make_diary: Callable[[str], Path],
+        content: bytes,
+        expected: int,
+    ) -> None:
+        """Only LF ends a line; CRLF counts like LF, lone CR doesn't split."""
+        make_diary("").write_bytes(content)
+
+        assert get_diary_line_count(base_path=tmp_path) == expected
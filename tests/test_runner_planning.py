@@ -1,46 +1,152 @@
 """Tests for planning command execution in runner utilities."""
 
+import signal
 import subprocess
-from unittest.mock import MagicMock, patch
+import sys
+from typing import Optional
+from unittest.mock import patch
+
+import pytest
 
 from wiggum.runner import run_claude_for_planning
 
 
-class TestRunClaudeForPlanning:
-    """Tests for run_claude_for_planning error handling."""
+class _FakeProcess:
+    """Popen stand-in whose first timed communicate() returns output or raises."""
 
-    @patch("wiggum.runner.check_cli_available", return_value=True)
-    @patch("wiggum.runner.subprocess.run")
-    def test_returns_error_on_nonzero_exit(self, mock_run, _mock_check_cli) -> None:
-        """Returns actionable error details when Claude exits non-zero."""
-        mock_run.return_value = MagicMock(returncode=2, stdout="", stderr="boom")
+    pid = 4242
 
-        output, error = run_claude_for_planning("meta prompt")
+    def __init__(
+        self,
+        returncode: int = 0,
+        stdout: str = "",
+        stderr: str = "",
+        error: Optional[BaseException] = None,
+    ) -> None:
+        self.returncode = returncode
+        self._output = (stdout, stderr)
+        self._error = error
+        self.communicate_timeouts: list[Optional[float]] = []
+        self.exited = False
 
-        assert output is None
-        assert error is not None
-        assert "exit code 2" in error
-        assert "boom" in error
+    def __enter__(self) -> "_FakeProcess":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.exited = True
 
+    def communicate(self, timeout: Optional[float] = None) -> tuple[str, str]:
+        self.communicate_timeouts.append(timeout)
+        if self._error is not None and timeout is not None:
+            raise self._error
+        return self._output
+
+
+class TestRunClaudeForPlanning:
+    """Tests for run_claude_for_planning error handling."""
+
+    @pytest.mark.parametrize(
+        ("returncode", "stdout", "stderr", "expected_output", "error_fragments"),
+        [
+            pytest.param(0, "ok", "", "ok", (), id="success"),
+            pytest.param(
+                2, "", "boom", None, ("exit code 2", "boom"), id="nonzero-exit"
+            ),
+        ],
+    )
     @patch("wiggum.runner.check_cli_available", return_value=True)
-    @patch("wiggum.runner.subprocess.run")
-    def test_returns_stdout_on_success(self, mock_run, _mock_check_cli) -> None:
-        """Returns stdout with no error when command succeeds."""
-        mock_run.return_value = MagicMock(returncode=0, stdout="ok", stderr="")
+    @patch("wiggum.runner.subprocess.Popen")
+    def test_reports_command_result(
+        self,
+        mock_popen,
+        _mock_check_cli,
+        returncode: int,
+        stdout: str,
+        stderr: str,
+        expected_output: Optional[str],
+        error_fragments: tuple[str, ...],
+    ) -> None:
+        """Returns stdout on success and actionable error details on non-zero exit."""
+        mock_popen.return_value = _FakeProcess(returncode, stdout, stderr)
 
         output, error = run_claude_for_planning("meta prompt")
 
-        assert output == "ok"
-        assert error is None
+        assert output == expected_output
+        if error_fragments:
+            assert error is not None
+            for fragment in error_fragments:
+                assert fragment in error
+        else:
+            assert error is None
 
+    @patch("wiggum.runner.os.killpg")
     @patch("wiggum.runner.check_cli_available", return_value=True)
-    @patch("wiggum.runner.subprocess.run")
-    def test_returns_error_on_timeout(self, mock_run, _mock_check_cli) -> None:
+    @patch("wiggum.runner.subprocess.Popen")
+    def test_returns_error_on_timeout(
+        self, mock_popen, _mock_check_cli, mock_killpg
+    ) -> None:
         """Returns timeout error details when Claude planning hangs."""
-        mock_run.side_effect = subprocess.TimeoutExpired(cmd="claude", timeout=60)
+        mock_popen.return_value = _FakeProcess(
+            error=subprocess.TimeoutExpired(cmd="claude", timeout=60)
+        )
 
         output, error = run_claude_for_planning("meta prompt", timeout_seconds=60)
 
         assert output is None
         assert error is not None
         assert "timed out" in error
+
+    @patch("wiggum.runner.os.killpg")
+    @patch("wiggum.runner.check_cli_available", return_value=True)
+    @patch("wiggum.runner.subprocess.Popen")
+    def test_kills_process_group_on_timeout(
+        self, mock_popen, _mock_check_cli, mock_killpg
+    ) -> None:
+        """Kills Claude's whole process group on timeout, then reaps it."""
+        process = _FakeProcess(
+            error=subprocess.TimeoutExpired(cmd="claude", timeout=60)
+        )
+        mock_popen.return_value = process
+
+        run_claude_for_planning("meta prompt", timeout_seconds=60)
+
+        assert mock_popen.call_args.kwargs["start_new_session"] is True
+        mock_killpg.assert_called_once_with(process.pid, signal.SIGKILL)
+        assert process.communicate_timeouts == [60, None]
+
+    @patch("wiggum.runner.os.killpg")
+    @patch("wiggum.runner.check_cli_available", return_value=True)
+    @patch("wiggum.runner.subprocess.Popen")
+    def test_kills_process_group_on_interrupt(
+        self, mock_popen, _mock_check_cli, mock_killpg
+    ) -> None:
+        """Kills Claude's process group when interrupted, then re-raises.
+
+        Claude runs in its own session, so a terminal Ctrl-C never reaches it.
+        """
+        process = _FakeProcess(error=KeyboardInterrupt())
+        mock_popen.return_value = process
+
+        with pytest.raises(KeyboardInterrupt):
+            run_claude_for_planning("meta prompt")
+
+        mock_killpg.assert_called_once_with(process.pid, signal.SIGKILL)
+        assert process.exited
+
+    @patch("wiggum.runner.check_cli_available", return_value=True)
+    def test_replaces_invalid_utf8_in_real_output(
+        self, _mock_check_cli, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Turns undecodable bytes from a real process into U+FFFD."""
+        real_popen = subprocess.Popen
+        # Stand in for claude with a Python process that prints invalid UTF-8
+        script = "import sys; sys.stdout.buffer.write(b'ok \\xff done\\n')"
+        monkeypatch.setattr(
+            "wiggum.runner.subprocess.Popen",
+            lambda _cmd, **kwargs: real_popen([sys.executable, "-c", script], **kwargs),
+        )
+
+        output, error = run_claude_for_planning("meta prompt")
+
+        assert error is None
+        assert output == "ok \ufffd done\n"
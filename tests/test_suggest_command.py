@@ -427,8 +427,6 @@ security_mode: conservative
         """Uses README.md content for context if available."""
         tasks_file = tmp_path / "TODO.md"
         tasks_file.write_text("# Tasks\n\n## Todo\n\n")
-        readme_file = tmp_path / "README.md"
-        readme_file.write_text("# My Project\n\nThis is a test project.")
 
         mock_output = """```markdown
 ## Tasks
@@ -447,8 +445,7 @@ security_mode: conservative
             return (mock_output, None)
 
         with runner.isolated_filesystem(temp_dir=tmp_path):
-            # Copy README to isolated filesystem
-            Path("README.md").write_text(readme_file.read_text())
+            Path("README.md").write_text("# My Project\n\nThis is a test project.")
             with patch(
                 "wiggum.runner.run_claude_for_planning", side_effect=capture_prompt
             ):
@@ -271,6 +271,24 @@ class TestConfigUpgrade:
         assert merged["security"]["yolo"] is True
         assert merged["security"]["allow_paths"] == "src/"
 
+    def test_merge_config_keeps_non_table_section(self) -> None:
+        """Test that a known section set to a non-table value is kept as-is."""
+        from wiggum.upgrade import (
+            get_missing_config_options,
+            merge_config_with_defaults,
+        )
+
+        existing = {"security": {"yolo": True}, "loop": 1}
+
+        missing_sections = {
+            section for section, _, _ in get_missing_config_options(existing)
+        }
+        assert "loop" not in missing_sections
+        merged = merge_config_with_defaults(existing)
+
+        assert merged["loop"] == 1
+        assert merged["security"]["yolo"] is True
+
 
 class TestTasksUpgrade:
     """Test TODO.md upgrade logic."""
@@ -298,3 +316,87 @@ class TestTasksUpgrade:
         assert "## Done" in upgraded
         # Should preserve existing tasks
         assert "- [x] Task 1" in upgraded
+
+
+class TestTasksMigration:
+    """Test TASKS.md -> TODO.md migration cleanup."""
+
+    def test_removes_legacy_gitignore_entries(self, tmp_path: Path) -> None:
+        """Only root-anchored /TASKS.md and /DONE.md lines are removed."""
+        import os
+
+        from wiggum.upgrade import migrate_tasks_to_todo
+
+        original_cwd = os.getcwd()
+        os.chdir(tmp_path)
+        try:
+            Path(".gitignore").write_text(
+                "/TASKS.md\nnode_modules/\n/DONE.md\ndocs/TASKS.md\n"
+            )
+
+            actions = migrate_tasks_to_todo()
+
+            assert Path(".gitignore").read_text() == "node_modules/\ndocs/TASKS.md\n"
+            assert "Removed /TASKS.md and /DONE.md from .gitignore" in actions
+        finally:
+            os.chdir(original_cwd)
+
+    def test_gitignore_cleanup_translates_newlines(self, tmp_path: Path) -> None:
+        """CRLF and lone CR line endings are read as newlines, like read_text()."""
+        import os
+
+        from wiggum.upgrade import migrate_tasks_to_todo
+
+        original_cwd = os.getcwd()
+        os.chdir(tmp_path)
+        try:
+            Path(".gitignore").write_bytes(b"/TASKS.md\r\nnode_modules/\r/DONE.md\n")
+
+            migrate_tasks_to_todo()
+
+            assert Path(".gitignore").read_text() == "node_modules/\n"
+        finally:
+            os.chdir(original_cwd)
+
+    def test_updates_legacy_tasks_file_setting(self, tmp_path: Path) -> None:
+        """A tasks_file = "TASKS.md" setting is rewritten to TODO.md."""
+        import os
+
+        from wiggum.upgrade import migrate_tasks_to_todo
+
+        original_cwd = os.getcwd()
+        os.chdir(tmp_path)
+        try:
+            Path(".wiggum.toml").write_text('[loop]\ntasks_file = "TASKS.md"\n')
+            Path(".gitignore").write_text("node_modules/\n")
+
+            actions = migrate_tasks_to_todo()
+
+            assert Path(".wiggum.toml").read_text() == (
+                '[loop]\ntasks_file = "TODO.md"\n'
+            )
+            assert Path(".gitignore").read_text() == "node_modules/\n"
+            assert actions == ['Updated .wiggum.toml: tasks_file = "TODO.md"']
+        finally:
+            os.chdir(original_cwd)
+
+
+class TestBackupPath:
+    """Test backup file naming."""
+
+    def test_first_backup_uses_bak_suffix(self, tmp_path: Path) -> None:
+        """The first backup is <name>.bak."""
+        from wiggum.upgrade import get_next_backup_path
+
+        path = tmp_path / "LOOP-PROMPT.md"
+        assert get_next_backup_path(path) == tmp_path / "LOOP-PROMPT.md.bak"
+
+    def test_numbered_backup_fills_first_gap(self, tmp_path: Path) -> None:
+        """Later backups use the lowest unused number."""
+        from wiggum.upgrade import get_next_backup_path
+
+        for suffix in (".bak", ".bak.1", ".bak.3"):
+            (tmp_path / f"LOOP-PROMPT.md{suffix}").write_text("old")
+
+        path = tmp_path / "LOOP-PROMPT.md"
+        assert get_next_backup_path(path) == tmp_path / "LOOP-PROMPT.md.bak.2"